@@ -1,16 +1,42 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Response, Query, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, DeleteOne, IndexModel, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, WriteError
 import os
+import io
+import re
+import json
+import asyncio
+import hashlib
+import csv
+import heapq
+import gzip
+import shutil
+import mimetypes
+import math
 import logging
+import httpx
+import numpy as np
+import pandas as pd
 from pathlib import Path
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, validator
+from typing import List, Optional, Union, get_args
+from urllib.parse import quote, urlsplit
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import uuid
+import base64
+import binascii
 from datetime import datetime, timezone, time
 from enum import Enum
+from PIL import Image, UnidentifiedImageError
 
 
 ROOT_DIR = Path(__file__).parent
@@ -62,13 +88,121 @@ def string_to_time(time_str: str) -> Optional[time]:
         return None
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create uploads directory and serve static files
 from pathlib import Path
 uploads_dir = Path("/app/uploads")
 uploads_dir.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
+content_dir = uploads_dir / "c"
+content_dir.mkdir(exist_ok=True)
+
+# Everything under /uploads is written once under a UUID or SHA-256 name and never
+# modified, so those files can be cached forever and validated by a strong ETag.
+IMMUTABLE_UPLOAD_NAME = re.compile(r"^([0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})[._]")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+RANGE_CHUNK_SIZE = 64 * 1024
+
+def parse_byte_range(header: str, size: int) -> Optional[tuple]:
+    """Inclusive (start, end) for a single byte range, or None to serve the whole file.
+
+    Raises ValueError when the range cannot be satisfied. Multi-range and malformed
+    headers are ignored, which RFC 9110 permits."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = (part.strip() for part in spec.partition("-"))
+    if (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if not first:
+        if int(last) == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+async def iter_file_range(path: str, start: int, end: int):
+    handle = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(handle.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(handle.read, min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(handle.close)
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles with strong ETags, long-lived caching, byte ranges and precompressed variants"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        name = os.path.basename(full_path)
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Vary": "Accept-Encoding",
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if IMMUTABLE_UPLOAD_NAME.match(name) else "no-cache",
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            candidates = {tag.strip() for tag in if_none_match.split(",")}
+            if "*" in candidates or candidates & {etag, f"{etag[:-1]}-br\"", f"{etag[:-1]}-gzip\""}:
+                return Response(status_code=304, headers=headers)
+
+        range_header = request_headers.get("range")
+        if range_header and scope["method"] == "GET" and request_headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_byte_range(range_header, stat_result.st_size)
+            except ValueError:
+                return Response(
+                    status_code=416,
+                    headers={**headers, "Content-Range": f"bytes */{stat_result.st_size}"}
+                )
+            if byte_range:
+                start, end = byte_range
+                return StreamingResponse(
+                    iter_file_range(full_path, start, end),
+                    status_code=206,
+                    media_type=media_type,
+                    headers={
+                        **headers,
+                        "Content-Range": f"bytes {start}-{end}/{stat_result.st_size}",
+                        "Content-Length": str(end - start + 1),
+                    }
+                )
+
+        accepted = {
+            part.split(";")[0].strip().lower()
+            for part in request_headers.get("accept-encoding", "").split(",")
+        }
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            variant = full_path + suffix
+            if encoding in accepted and os.path.isfile(variant):
+                return FileResponse(
+                    variant,
+                    status_code=status_code,
+                    media_type=media_type,
+                    headers={**headers, "ETag": f"{etag[:-1]}-{encoding}\"", "Content-Encoding": encoding}
+                )
+        return FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers
+        )
+
+app.mount("/uploads", UploadStaticFiles(directory=str(uploads_dir)), name="uploads")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -254,6 +388,27 @@ class ExerciseBuilderUpdate(BaseModel):
     artificialities: Optional[List[dict]] = None
     safetyConcerns: Optional[List[dict]] = None
 
+class ExerciseBuilderSummary(BaseModel):
+    """Exercise list row without embedded images or the step collections"""
+    id: str
+    exercise_name: str
+    exercise_type: str
+    exercise_description: str
+    location: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    start_date: datetime
+    start_time: str
+    end_date: datetime
+    end_time: str
+    scenario_name: str = ""
+    has_image: bool = False
+    image_url: Optional[str] = None
+    has_scenario_image: bool = False
+    scenario_image_url: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 # Exercise Components Models
 class ExerciseGoal(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -382,12 +537,14 @@ class MSELEvent(BaseModel):
     notes: str = ""
     completed: bool = False
     actual_time: Optional[str] = None  # When event actually occurred
+    scenario_offset_seconds: Optional[int] = None  # scenario_time as seconds after exercise start, if parseable
+    sort_key: Optional[float] = None  # Position in the MSEL; fractional so inserts and moves touch one event
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class MSELEventCreate(BaseModel):
     exercise_id: str = ""
-    event_number: int
+    event_number: Optional[int] = None  # Assigned from the exercise counter when omitted
     scenario_time: str
     event_type: str
     inject_mode: str
@@ -397,6 +554,7 @@ class MSELEventCreate(BaseModel):
     expected_response: str
     objective_capability_task: str
     notes: str = ""
+    after_event_id: Optional[str] = None  # Insert directly after this event instead of at the end
 
 class MSELEventUpdate(BaseModel):
     event_number: Optional[int] = None
@@ -436,6 +594,10 @@ class HIRAEntry(BaseModel):
     change_in_vulnerability: List[bool] = [False, False, False]  # 3 checkboxes
     # Image upload
     hazard_image: Optional[str] = None  # Base64 encoded image
+    # Derived risk, computed server-side on every write
+    max_impact: int = 0
+    risk_score: int = 0
+    risk_level: str = "Low"  # Low, Medium, High, Critical
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class HIRAEntryCreate(BaseModel):
@@ -458,6 +620,33 @@ class HIRAEntryCreate(BaseModel):
     change_in_vulnerability: List[bool] = [False, False, False]
     hazard_image: Optional[str] = None
 
+class HIRAEntrySummary(BaseModel):
+    """HIRA list row without the embedded hazard image"""
+    id: str
+    name: str
+    description: str
+    notes: str = ""
+    disaster_type: str
+    latitude: float = 0.0
+    longitude: float = 0.0
+    frequency: int
+    fatalities: int
+    injuries: int
+    evacuation: int
+    property_damage: int
+    critical_infrastructure: int
+    environmental_damage: int
+    business_financial_impact: int
+    psychosocial_impact: int
+    change_in_frequency: List[bool] = [False, False, False, False]
+    change_in_vulnerability: List[bool] = [False, False, False]
+    max_impact: int = 0
+    risk_score: int = 0
+    risk_level: str = "Low"
+    has_image: bool = False
+    image_url: Optional[str] = None
+    created_at: datetime
+
 # Participant Models
 class Participant(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -509,6 +698,33 @@ class ParticipantCreate(BaseModel):
     involvedInExercise: bool = False
     profileImage: Optional[str] = None  # Base64 encoded image
 
+class ParticipantSummary(BaseModel):
+    """Roster row without the embedded profile image"""
+    id: str
+    name: str
+    email: str
+    phone: str
+    address: str = ""
+    organization: str = ""
+    role: str = ""
+    experience_level: str = ""
+    certifications: List[str] = []
+    firstName: str = ""
+    lastName: str = ""
+    position: str = ""
+    assignedTo: str = ""
+    city: str = ""
+    provinceState: str = ""
+    country: str = "Canada"
+    homePhone: str = ""
+    cellPhone: str = ""
+    latitude: str = ""
+    longitude: str = ""
+    involvedInExercise: bool = False
+    has_image: bool = False
+    image_url: Optional[str] = None
+    created_at: datetime
+
 # Scribe Template Models
 class ScribeTemplateEvent(BaseModel):
     time: str = ""
@@ -637,6 +853,23 @@ class ResourceUpdate(BaseModel):
     resource_image: Optional[str] = None
     involved_in_exercise: Optional[bool] = None
 
+class ResourceSummary(BaseModel):
+    """Resource list row without the embedded resource image"""
+    id: str
+    resource_type: str
+    identification: str
+    description: str
+    quantity_available: int
+    quantity_needed: int
+    location: str
+    contact_person: str
+    contact_phone: str
+    involved_in_exercise: bool = False
+    has_image: bool = False
+    image_url: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 # Evaluation Report Models
 class EvaluationAreaAssessment(BaseModel):
     area_name: str
@@ -718,6 +951,21 @@ class EvaluationReportUpdate(BaseModel):
     plan_adherence_adaptability: Optional[EvaluationAreaAssessment] = None
     evaluation_images: Optional[List[str]] = None
 
+class EvaluationReportSummary(BaseModel):
+    """Evaluation report list row without the embedded supporting images"""
+    id: str
+    exercise_id: str
+    report_title: str
+    evaluator_name: str
+    evaluator_organization: str = ""
+    evaluation_date: str
+    summary_of_findings: str = ""
+    has_image: bool = False
+    image_count: int = 0
+    image_urls: List[str] = Field(default_factory=list)
+    created_at: datetime
+    updated_at: datetime
+
 # Location Management Models
 class Location(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -804,54 +1052,611 @@ class WeatherLocation(WeatherLocationBase):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Helper functions
-def prepare_for_mongo(data):
+def parse_datetime(value):
+    """Parse an ISO 8601 string into an aware datetime, leaving other values untouched"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return value
+    if isinstance(value, datetime) and value.tzinfo is None:
+        # BSON dates come back naive but are always stored as UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+class MongoCodec:
+    """Converts only a model's declared datetime fields to and from native BSON dates"""
+
+    def __init__(self, model: type):
+        self.datetime_fields = tuple(
+            name for name, field in model.model_fields.items()
+            if field.annotation is datetime or datetime in get_args(field.annotation)
+        )
+
+    def to_mongo(self, data: dict) -> dict:
+        for name in self.datetime_fields:
+            if name in data:
+                data[name] = parse_datetime(data[name])
+        return data
+
+    def from_mongo(self, document: dict) -> dict:
+        for name in self.datetime_fields:
+            if name in document:
+                document[name] = parse_datetime(document[name])
+        return document
+
+@lru_cache(maxsize=None)
+def mongo_codec(model: type) -> MongoCodec:
+    return MongoCodec(model)
+
+def prepare_for_mongo(data, model: type):
     if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
+        mongo_codec(model).to_mongo(data)
     return data
 
-def parse_from_mongo(item):
+def parse_from_mongo(item, model: type):
     if isinstance(item, dict):
-        for key, value in item.items():
-            if isinstance(value, str) and 'T' in value:
-                try:
-                    item[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                except (ValueError, TypeError):
-                    pass
+        mongo_codec(model).from_mongo(item)
     return item
 
+def has_image_expr(field: str, is_list: bool = False) -> dict:
+    """Aggregation expression that is true when an embedded image field is populated"""
+    if is_list:
+        return {"$gt": [{"$size": {"$ifNull": [f"${field}", []]}}, 0]}
+    return {"$gt": [{"$strLenCP": {"$ifNull": [f"${field}", ""]}}, 0]}
+
+# Summary fields that are derived at read time rather than stored on the document
+SUMMARY_DERIVED_FIELDS = {"has_image", "image_url", "has_scenario_image", "scenario_image_url", "image_count", "image_urls"}
+
+def summary_projection(model: type, **computed) -> dict:
+    """Build a $project stage keeping the summary model's stored fields plus computed flags"""
+    projection = {"_id": 0}
+    for name in model.model_fields:
+        if name not in SUMMARY_DERIVED_FIELDS:
+            projection[name] = 1
+    projection.update(computed)
+    return projection
+
+def decode_image_data(value: str) -> tuple:
+    """Decode a stored base64 image (raw or data URI) into bytes and a media type"""
+    media_type = "application/octet-stream"
+    payload = value
+    if value.startswith("data:") and "," in value:
+        header, payload = value.split(",", 1)
+        media_type = header[5:].split(";", 1)[0] or media_type
+    try:
+        return base64.b64decode(payload), media_type
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=422, detail="Stored image is not valid base64 data")
+
+async def embedded_image_response(collection, doc_id: str, field: str, detail: str,
+                                  index: Optional[int] = None, size: Optional[str] = None):
+    """Serve a single embedded image so list views can lazy-load it per row"""
+    document = await collection.find_one({"id": doc_id}, {"_id": 0, field: 1})
+    if not document:
+        raise HTTPException(status_code=404, detail=detail)
+    value = document.get(field)
+    if index is not None:
+        value = value[index] if isinstance(value, list) and 0 <= index < len(value) else None
+    if not value:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if value.startswith(BLOB_URL_PREFIX):
+        # Images already moved to the blob store are served (and thumbnailed) from there
+        return RedirectResponse(f"{value}?size={size}" if size else value)
+    content, media_type = decode_image_data(value)
+    return Response(content=content, media_type=media_type, headers={"Cache-Control": "private, max-age=300"})
+
+# Blob Store
+# Images are stored once on disk keyed by their SHA-256 and documents hold a
+# "/api/blobs/<sha256>" reference, which the frontend can use directly as an <img> src.
+BLOB_URL_PREFIX = "/api/blobs/"
+blobs_dir = uploads_dir / "blobs"
+blobs_dir.mkdir(exist_ok=True)
+THUMBNAIL_SIZES = {"small": 128, "medium": 512}
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Collections whose documents may carry embedded base64 images
+IMAGE_COLLECTIONS = [
+    "exercise_builder", "exercise_events", "exercise_organizations", "hira_entries",
+    "participants", "resources", "evaluation_reports", "lessons_learned", "scenarios", "map_objects",
+]
+
+def blob_path(digest: str) -> Path:
+    return blobs_dir / digest[:2] / digest
+
+def write_blob_file(digest: str, content: bytes):
+    """Write blob content atomically so readers never see a partial file"""
+    path = blob_path(digest)
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+    temp_path.write_bytes(content)
+    os.replace(temp_path, path)
+
+def render_thumbnails(content: bytes) -> dict:
+    """Render the configured thumbnail sizes, returning {name: (bytes, media_type)}"""
+    thumbnails = {}
+    try:
+        with Image.open(io.BytesIO(content)) as source:
+            source.load()
+            for name, edge in THUMBNAIL_SIZES.items():
+                image = source.copy()
+                image.thumbnail((edge, edge))
+                buffer = io.BytesIO()
+                if image.mode in ("RGBA", "LA", "P"):
+                    image.convert("RGBA").save(buffer, "PNG", optimize=True)
+                    thumbnails[name] = (buffer.getvalue(), "image/png")
+                else:
+                    image.convert("RGB").save(buffer, "JPEG", quality=85, optimize=True)
+                    thumbnails[name] = (buffer.getvalue(), "image/jpeg")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"Skipping thumbnails for undecodable image: {e}")
+        return {}
+    return thumbnails
+
+async def put_blob(content: bytes, media_type: str) -> str:
+    """Store content once by SHA-256 and generate its thumbnails at write time"""
+    digest = hashlib.sha256(content).hexdigest()
+    if await db.blobs.find_one({"sha256": digest}, {"_id": 0, "sha256": 1}):
+        return digest
+
+    await asyncio.to_thread(write_blob_file, digest, content)
+    thumbnails = {}
+    if media_type.startswith("image/"):
+        rendered = await asyncio.to_thread(render_thumbnails, content)
+        for name, (thumb_content, thumb_media_type) in rendered.items():
+            thumb_digest = hashlib.sha256(thumb_content).hexdigest()
+            await asyncio.to_thread(write_blob_file, thumb_digest, thumb_content)
+            thumbnails[name] = {"sha256": thumb_digest, "media_type": thumb_media_type}
+
+    await db.blobs.update_one(
+        {"sha256": digest},
+        {"$setOnInsert": {
+            "sha256": digest,
+            "media_type": media_type,
+            "size": len(content),
+            "thumbnails": thumbnails,
+            "created_at": datetime.now(timezone.utc),
+        }},
+        upsert=True
+    )
+    return digest
+
+# Base64 spellings of the image signatures sniff_upload_type recognises; only
+# strings starting with one are decoded when looking for bare base64 images
+RAW_BASE64_IMAGE_PREFIXES = ("/9j/", "iVBORw0KGgo", "R0lGOD", "UklGR", "SUkqA", "TU0AK")
+
+def decode_raw_base64_image(value: str) -> Optional[tuple]:
+    """Bytes and media type of a bare base64 image, such as one pasted into the map
+    object image field, or None when the string is not one"""
+    if not value.startswith(RAW_BASE64_IMAGE_PREFIXES):
+        return None
+    try:
+        # Pasted base64 may be wrapped across lines but never contains spaces
+        content = base64.b64decode(value.replace("\r", "").replace("\n", ""), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    sniffed = sniff_upload_type(content[:16])
+    if sniffed is None or not sniffed[0].startswith("image/"):
+        return None
+    return content, sniffed[0]
+
+def embedded_image(value) -> Optional[tuple]:
+    """Bytes and media type of an image stored inline as a data URI or bare base64"""
+    if not isinstance(value, str):
+        return None
+    if value.startswith("data:image/"):
+        return decode_image_data(value)
+    return decode_raw_base64_image(value)
+
+def has_embedded_images(data) -> bool:
+    """Check whether a value still holds any inline base64 images"""
+    if isinstance(data, dict):
+        return any(has_embedded_images(value) for value in data.values())
+    if isinstance(data, list):
+        return any(has_embedded_images(value) for value in data)
+    return embedded_image(data) is not None
+
+async def store_embedded_images(data):
+    """Replace inline base64 images anywhere in a document with blob store references"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            data[key] = await store_embedded_images(value)
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            data[index] = await store_embedded_images(value)
+    else:
+        image = embedded_image(data)
+        if image:
+            content, media_type = image
+            digest = await put_blob(content, media_type)
+            return f"{BLOB_URL_PREFIX}{digest}"
+    return data
+
+# Keyset pagination
+# List endpoints return at most one page sorted by (created_at, id); the opaque
+# cursor for the following page is sent in the X-Next-Cursor response header so
+# the body stays a plain list for existing clients.
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+PAGE_SORT = [("created_at", 1), ("id", 1)]
+
+def encode_cursor(document: dict) -> str:
+    """Encode the sort key of the last document on a page as an opaque cursor"""
+    created_at = document.get("created_at")
+    if isinstance(created_at, datetime):
+        key = {"t": "date", "c": created_at.isoformat()}
+    else:
+        key = {"t": "str", "c": created_at}
+    key["id"] = document.get("id")
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def cursor_filter(cursor: str) -> dict:
+    """Translate a cursor into a filter selecting documents strictly after it"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(key["c"]) if key["t"] == "date" else key["c"]
+        last_id = key["id"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    clauses = [{"created_at": created_at, "id": {"$gt": last_id}}]
+    # Mongo compares across types by type order (null < string < date), so a page
+    # ending on a legacy string or missing created_at must also admit every
+    # document of a later type, or everything written since would be skipped
+    if created_at is None:
+        clauses.append({"created_at": {"$type": ["string", "date"]}})
+    elif isinstance(created_at, str):
+        clauses += [{"created_at": {"$gt": created_at}}, {"created_at": {"$type": "date"}}]
+    else:
+        clauses.append({"created_at": {"$gt": created_at}})
+    return {"$or": clauses}
+
+async def fetch_page(collection, query: dict, limit: int, after: Optional[str], response: Response,
+                     projection: Optional[dict] = None) -> list:
+    """Fetch one keyset page and advertise the next cursor on the response"""
+    if after:
+        query = {"$and": [query, cursor_filter(after)]} if query else cursor_filter(after)
+    documents = await collection.find(query, projection).sort(PAGE_SORT).limit(limit + 1).to_list(limit + 1)
+    if len(documents) > limit:
+        documents = documents[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(documents[-1])
+    return documents
+
+# Fast list serialization
+# Rows read from Mongo are trusted, so list endpoints validate them in a single
+# TypeAdapter pass and return the encoded bytes directly; FastAPI then skips
+# re-validating the result against response_model.
+@lru_cache(maxsize=None)
+def list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def fast_list_response(model: type, documents: list, headers: Optional[dict] = None) -> Response:
+    codec = mongo_codec(model)
+    adapter = list_adapter(model)
+    rows = adapter.validate_python([codec.from_mongo(document) for document in documents])
+    return Response(content=adapter.dump_json(rows), media_type="application/json", headers=headers)
+
+# NDJSON streaming
+# Large exports can be requested with "Accept: application/x-ndjson" or ?stream=1;
+# the cursor is then iterated in batches and each document is written as it arrives.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def ndjson_response(collection, query: dict, model: type, sort: list = PAGE_SORT) -> StreamingResponse:
+    """Stream a query result as newline-delimited JSON without buffering the cursor"""
+    async def rows():
+        cursor = collection.find(query, {"_id": 0}).sort(sort).batch_size(STREAM_BATCH_SIZE)
+        async for document in cursor:
+            yield model(**parse_from_mongo(document, model)).json() + "\n"
+    return StreamingResponse(rows(), media_type=NDJSON_MEDIA_TYPE)
+
+# Index registry
+# Every collection is looked up by its custom "id" string, and child collections
+# are read per exercise; these indexes are ensured at application startup.
+def id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], name="id_unique", unique=True)
+
+def page_index() -> IndexModel:
+    return IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id")
+
+def exercise_index(*fields: str) -> IndexModel:
+    keys = [("exercise_id", ASCENDING)] + [(field, ASCENDING) for field in fields]
+    return IndexModel(keys, name="_".join(["exercise_id", *fields]))
+
+INDEX_REGISTRY = {
+    "exercise_builder": [id_index()],
+    "exercise_goals": [id_index(), exercise_index()],
+    "exercise_objectives": [id_index(), exercise_index()],
+    "exercise_events": [id_index(), exercise_index()],
+    "exercise_functions": [id_index(), exercise_index()],
+    "exercise_organizations": [id_index(), exercise_index()],
+    "msel_events": [
+        id_index(), page_index(), exercise_index("event_number"),
+        exercise_index("completed", "scenario_offset_seconds", "event_number"),
+        exercise_index("sort_key"),
+    ],
+    "exercise_timelines": [IndexModel([("exercise_id", ASCENDING)], name="exercise_id_unique", unique=True)],
+    "hira_entries": [
+        id_index(), page_index(),
+        IndexModel([("risk_score", DESCENDING), ("id", ASCENDING)], name="risk_score_id"),
+        IndexModel([("risk_level", ASCENDING), ("risk_score", DESCENDING)], name="risk_level_risk_score"),
+    ],
+    "participants": [
+        id_index(), page_index(),
+        IndexModel([("involvedInExercise", ASCENDING), ("role", ASCENDING)], name="involved_role"),
+    ],
+    "locations": [id_index()],
+    "scribe_templates": [id_index(), page_index(), exercise_index()],
+    "resources": [id_index(), page_index()],
+    "evaluation_reports": [id_index(), exercise_index()],
+    "lessons_learned": [id_index(), page_index(), exercise_index("serial_number")],
+    "weather_locations": [
+        id_index(), page_index(),
+        IndexModel([("state_province", ASCENDING), ("city", ASCENDING)], name="state_province_city_unique", unique=True),
+    ],
+    "scenarios": [id_index(), exercise_index()],
+    "map_objects": [
+        id_index(), exercise_index("created_at", "id"), exercise_index("type"),
+        IndexModel([("exercise_id", ASCENDING), ("geometry", "2dsphere")], name="exercise_id_geometry_2dsphere"),
+    ],
+    "blobs": [IndexModel([("sha256", ASCENDING)], name="sha256_unique", unique=True)],
+    "uploads": [IndexModel([("sha256", ASCENDING)], name="sha256_unique", unique=True)],
+}
+
+# Older indexes on the same keys as a registry entry, dropped so it can be created
+SUPERSEDED_INDEXES = {
+    "weather_locations": ["state_province_city"],
+}
+
+async def ensure_indexes():
+    """Create any registered index that does not exist yet"""
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        for name in SUPERSEDED_INDEXES.get(collection_name, []):
+            try:
+                await db[collection_name].drop_index(name)
+            except OperationFailure:
+                pass
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure:
+            # Duplicate legacy ids or unindexable geometries must not keep the API
+            # from starting, nor block the collection's other indexes
+            for index in indexes:
+                try:
+                    await db[collection_name].create_indexes([index])
+                except OperationFailure as e:
+                    logger.error(f"Could not ensure index {index.document['name']} on {collection_name}: {e}")
+
+# Counters
+# Per-exercise sequence numbers are handed out atomically from the counters
+# collection instead of scanning existing documents for the current maximum.
+COUNTER_SOURCES = {
+    "lessons_learned": "serial_number",
+    "msel_events": "event_number",
+}
+
+def counter_key(collection_name: str, exercise_id: str) -> str:
+    return f"{collection_name}:{exercise_id}"
+
+async def next_sequence(collection_name: str, exercise_id: str) -> int:
+    counter = await db.counters.find_one_and_update(
+        {"_id": counter_key(collection_name, exercise_id)},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"]
+
+async def reserve_sequence(collection_name: str, exercise_id: str, count: int) -> int:
+    """Claim count consecutive numbers at once and return the first"""
+    counter = await db.counters.find_one_and_update(
+        {"_id": counter_key(collection_name, exercise_id)},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - count + 1
+
+async def advance_sequence(collection_name: str, exercise_id: str, value: int):
+    """Make sure the counter never hands out a number at or below an explicitly used one"""
+    await db.counters.update_one(
+        {"_id": counter_key(collection_name, exercise_id)},
+        {"$max": {"seq": value}},
+        upsert=True
+    )
+
+async def backfill_counters() -> dict:
+    """Seed counters from the highest number already stored for each exercise"""
+    seeded = {}
+    for collection_name, field in COUNTER_SOURCES.items():
+        pipeline = [{"$group": {"_id": "$exercise_id", "max_value": {"$max": f"${field}"}}}]
+        count = 0
+        async for row in db[collection_name].aggregate(pipeline):
+            if isinstance(row["max_value"], int):
+                await advance_sequence(collection_name, row["_id"] or "", row["max_value"])
+                count += 1
+        seeded[collection_name] = count
+    return seeded
+
+# Live exercise channel
+# Changes to MSEL events, map objects and scribe logs are fanned out to every
+# client subscribed to the exercise over SSE or WebSocket. By default handlers
+# publish directly; with EXERCISE_EVENTS_CHANGE_STREAMS set the bus tails a Mongo
+# change stream instead, so writes from every API process (and outside the API)
+# reach all subscribers. Change streams need a replica set, and routing deletes
+# needs pre-images (MongoDB 6+); otherwise the bus falls back to direct publishing.
+LIVE_COLLECTIONS = {
+    "msel_events": "msel",
+    "map_objects": "map_object",
+    "scribe_templates": "scribe",
+}
+LIVE_QUEUE_SIZE = 256
+LIVE_KEEPALIVE_SECONDS = 15
+
+class ExerciseEventBus:
+    def __init__(self, queue_size: int = LIVE_QUEUE_SIZE, change_streams: bool = False):
+        self.queue_size = queue_size
+        self.change_streams = change_streams
+        self.subscribers = {}
+        self.watch_task = None
+
+    def subscribe(self, exercise_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(exercise_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, exercise_id: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(exercise_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[exercise_id]
+
+    def publish(self, exercise_id: str, event: dict):
+        for queue in list(self.subscribers.get(exercise_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client this far behind should refetch rather than replay a backlog
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "exercise_id": exercise_id})
+
+    def publish_change(self, collection_name: str, action: str, document: dict, fields: Optional[list] = None):
+        """Publish a handler's write unless the change stream will deliver it"""
+        if self.watch_task is None:
+            self.publish(document["exercise_id"], live_event(collection_name, action, document, fields))
+
+    def start(self):
+        if self.change_streams and self.watch_task is None:
+            self.watch_task = asyncio.create_task(self.watch())
+
+    async def stop(self):
+        if self.watch_task is not None:
+            self.watch_task.cancel()
+            self.watch_task = None
+
+    async def watch(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(LIVE_COLLECTIONS)},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }}]
+        options = {"full_document": "updateLookup", "full_document_before_change": "whenAvailable"}
+        resume_token = None
+        while True:
+            try:
+                async with db.watch(pipeline, resume_after=resume_token, **options) as stream:
+                    logger.info("Live exercise channel following the change stream")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.publish_stream_change(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if "full_document_before_change" in options and e.code in (2, 9, 40415):
+                    logger.warning(f"Change stream pre-images unavailable, deletes will not be broadcast: {e}")
+                    options.pop("full_document_before_change")
+                    continue
+                logger.warning(f"Change streams unavailable, publishing from request handlers: {e}")
+                self.watch_task = None
+                return
+            except Exception as e:
+                logger.error(f"Live exercise change stream failed, resuming: {e}")
+                await asyncio.sleep(5)
+
+    def publish_stream_change(self, change: dict):
+        collection_name = change["ns"]["coll"]
+        if change["operationType"] == "delete":
+            document = change.get("fullDocumentBeforeChange")
+            action, fields = "deleted", None
+        else:
+            document = change.get("fullDocument")
+            action = "created" if change["operationType"] == "insert" else "updated"
+            updated_fields = change.get("updateDescription", {}).get("updatedFields")
+            fields = sorted({field.split(".")[0] for field in updated_fields}) if updated_fields else None
+        if document and document.get("exercise_id"):
+            self.publish(document["exercise_id"], live_event(collection_name, action, document, fields))
+
+def live_event(collection_name: str, action: str, document: dict, fields: Optional[list] = None) -> dict:
+    """Wire format shared by SSE and WebSocket subscribers"""
+    event = {
+        "type": f"{LIVE_COLLECTIONS[collection_name]}.{action}",
+        "exercise_id": document["exercise_id"],
+        "id": document.get("id"),
+    }
+    if action != "deleted":
+        model = LIVE_MODELS[collection_name]
+        event["data"] = jsonable_encoder(model(**parse_from_mongo(dict(document), model)))
+    if fields:
+        event["fields"] = fields
+    return event
+
+exercise_events = ExerciseEventBus(
+    change_streams=os.environ.get("EXERCISE_EVENTS_CHANGE_STREAMS", "").lower() in ("1", "true", "yes")
+)
+
 # Exercise Builder Routes
 @api_router.get("/exercise-builder", response_model=List[ExerciseBuilder])
 async def get_exercises():
     exercises = await db.exercise_builder.find().to_list(1000)
-    return [ExerciseBuilder(**parse_from_mongo(exercise)) for exercise in exercises]
+    return fast_list_response(ExerciseBuilder, exercises)
+
+@api_router.get("/exercise-builder/summary", response_model=List[ExerciseBuilderSummary])
+async def get_exercises_summary():
+    """List exercises without images or step collections"""
+    pipeline = [{"$project": summary_projection(
+        ExerciseBuilderSummary,
+        has_image=has_image_expr("exercise_image"),
+        has_scenario_image=has_image_expr("scenario_image"),
+    )}]
+    exercises = await db.exercise_builder.aggregate(pipeline).to_list(1000)
+    summaries = []
+    for exercise in exercises:
+        summary = ExerciseBuilderSummary(**parse_from_mongo(exercise, ExerciseBuilderSummary))
+        if summary.has_image:
+            summary.image_url = f"/api/exercise-builder/{summary.id}/image?size=small"
+        if summary.has_scenario_image:
+            summary.scenario_image_url = f"/api/exercise-builder/{summary.id}/scenario-image?size=small"
+        summaries.append(summary)
+    return summaries
+
+@api_router.get("/exercise-builder/{exercise_id}/image")
+async def get_exercise_image(exercise_id: str, size: Optional[str] = None):
+    return await embedded_image_response(db.exercise_builder, exercise_id, "exercise_image", "Exercise not found", size=size)
+
+@api_router.get("/exercise-builder/{exercise_id}/scenario-image")
+async def get_exercise_scenario_image(exercise_id: str, size: Optional[str] = None):
+    return await embedded_image_response(db.exercise_builder, exercise_id, "scenario_image", "Exercise not found", size=size)
 
 @api_router.get("/exercise-builder/{exercise_id}", response_model=ExerciseBuilder)
 async def get_exercise(exercise_id: str):
     exercise = await db.exercise_builder.find_one({"id": exercise_id})
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
-    return ExerciseBuilder(**parse_from_mongo(exercise))
+    return ExerciseBuilder(**parse_from_mongo(exercise, ExerciseBuilder))
 
 @api_router.post("/exercise-builder", response_model=ExerciseBuilder)
 async def create_exercise(exercise_data: ExerciseBuilderCreate):
-    exercise = ExerciseBuilder(**exercise_data.dict())
+    exercise = ExerciseBuilder(**await store_embedded_images(exercise_data.dict()))
     # Auto-copy exercise type to scope
     exercise.scope_exercise_type = exercise.exercise_type
-    exercise_mongo = prepare_for_mongo(exercise.dict())
+    exercise_mongo = prepare_for_mongo(exercise.dict(), ExerciseBuilder)
     await db.exercise_builder.insert_one(exercise_mongo)
     return exercise
 
 @api_router.put("/exercise-builder/{exercise_id}", response_model=ExerciseBuilder)
 async def update_exercise(exercise_id: str, exercise_data: ExerciseBuilderUpdate):
     # Only include non-None fields for partial updates
-    update_dict = exercise_data.dict(exclude_unset=True)
+    update_dict = await store_embedded_images(exercise_data.dict(exclude_unset=True))
     update_dict["updated_at"] = datetime.now(timezone.utc)
     # Auto-copy exercise type to scope if provided
     if update_dict.get("exercise_type"):
         update_dict["scope_exercise_type"] = update_dict["exercise_type"]
-    update_mongo = prepare_for_mongo(update_dict)
+    update_mongo = prepare_for_mongo(update_dict, ExerciseBuilder)
     
     result = await db.exercise_builder.update_one(
         {"id": exercise_id},
@@ -859,6 +1664,9 @@ async def update_exercise(exercise_id: str, exercise_data: ExerciseBuilderUpdate
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Exercise not found")
+    if "start_time" in update_mongo:
+        # Clock-time injects are offsets from the start time
+        await retime_msel_events(exercise_id)
     
     return await get_exercise(exercise_id)
 
@@ -867,7 +1675,7 @@ async def get_exercise(exercise_id: str):
     exercise = await db.exercise_builder.find_one({"id": exercise_id})
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
-    return ExerciseBuilder(**parse_from_mongo(exercise))
+    return ExerciseBuilder(**parse_from_mongo(exercise, ExerciseBuilder))
 
 @api_router.delete("/exercise-builder/{exercise_id}")
 async def delete_exercise(exercise_id: str):
@@ -880,60 +1688,60 @@ async def delete_exercise(exercise_id: str):
 @api_router.get("/exercise-goals/{exercise_id}", response_model=List[ExerciseGoal])
 async def get_exercise_goals(exercise_id: str):
     goals = await db.exercise_goals.find({"exercise_id": exercise_id}).to_list(1000)
-    return [ExerciseGoal(**parse_from_mongo(goal)) for goal in goals]
+    return [ExerciseGoal(**parse_from_mongo(goal, ExerciseGoal)) for goal in goals]
 
 @api_router.post("/exercise-goals", response_model=ExerciseGoal)
 async def create_exercise_goal(goal_data: dict):
     goal = ExerciseGoal(**goal_data)
-    goal_mongo = prepare_for_mongo(goal.dict())
+    goal_mongo = prepare_for_mongo(goal.dict(), ExerciseGoal)
     await db.exercise_goals.insert_one(goal_mongo)
     return goal
 
 @api_router.get("/exercise-objectives/{exercise_id}", response_model=List[ExerciseObjective])
 async def get_exercise_objectives(exercise_id: str):
     objectives = await db.exercise_objectives.find({"exercise_id": exercise_id}).to_list(1000)
-    return [ExerciseObjective(**parse_from_mongo(obj)) for obj in objectives]
+    return [ExerciseObjective(**parse_from_mongo(obj, ExerciseObjective)) for obj in objectives]
 
 @api_router.post("/exercise-objectives", response_model=ExerciseObjective)
 async def create_exercise_objective(objective_data: dict):
     objective = ExerciseObjective(**objective_data)
-    objective_mongo = prepare_for_mongo(objective.dict())
+    objective_mongo = prepare_for_mongo(objective.dict(), ExerciseObjective)
     await db.exercise_objectives.insert_one(objective_mongo)
     return objective
 
 @api_router.get("/exercise-events/{exercise_id}", response_model=List[ExerciseEvent])
 async def get_exercise_events(exercise_id: str):
     events = await db.exercise_events.find({"exercise_id": exercise_id}).to_list(1000)
-    return [ExerciseEvent(**parse_from_mongo(event)) for event in events]
+    return [ExerciseEvent(**parse_from_mongo(event, ExerciseEvent)) for event in events]
 
 @api_router.post("/exercise-events", response_model=ExerciseEvent)
 async def create_exercise_event(event_data: dict):
-    event = ExerciseEvent(**event_data)
-    event_mongo = prepare_for_mongo(event.dict())
+    event = ExerciseEvent(**await store_embedded_images(event_data))
+    event_mongo = prepare_for_mongo(event.dict(), ExerciseEvent)
     await db.exercise_events.insert_one(event_mongo)
     return event
 
 @api_router.get("/exercise-functions/{exercise_id}", response_model=List[ExerciseFunction])
 async def get_exercise_functions(exercise_id: str):
     functions = await db.exercise_functions.find({"exercise_id": exercise_id}).to_list(1000)
-    return [ExerciseFunction(**parse_from_mongo(func)) for func in functions]
+    return [ExerciseFunction(**parse_from_mongo(func, ExerciseFunction)) for func in functions]
 
 @api_router.post("/exercise-functions", response_model=ExerciseFunction)
 async def create_exercise_function(function_data: dict):
     function = ExerciseFunction(**function_data)
-    function_mongo = prepare_for_mongo(function.dict())
+    function_mongo = prepare_for_mongo(function.dict(), ExerciseFunction)
     await db.exercise_functions.insert_one(function_mongo)
     return function
 
 @api_router.get("/exercise-organizations/{exercise_id}", response_model=List[ExerciseOrganization])
 async def get_exercise_organizations(exercise_id: str):
     orgs = await db.exercise_organizations.find({"exercise_id": exercise_id}).to_list(1000)
-    return [ExerciseOrganization(**parse_from_mongo(org)) for org in orgs]
+    return [ExerciseOrganization(**parse_from_mongo(org, ExerciseOrganization)) for org in orgs]
 
 @api_router.post("/exercise-organizations", response_model=ExerciseOrganization)
 async def create_exercise_organization(org_data: dict):
-    org = ExerciseOrganization(**org_data)
-    org_mongo = prepare_for_mongo(org.dict())
+    org = ExerciseOrganization(**await store_embedded_images(org_data))
+    org_mongo = prepare_for_mongo(org.dict(), ExerciseOrganization)
     await db.exercise_organizations.insert_one(org_mongo)
     return org
 
@@ -952,7 +1760,7 @@ async def get_team_coordinators(exercise_id: str):
             {"position": {"$regex": "coordinator", "$options": "i"}}
         ]
     }).to_list(1000)
-    return [Participant(**parse_from_mongo(p)) for p in participants]
+    return [Participant(**parse_from_mongo(p, Participant)) for p in participants]
 
 # Get Safety Officer
 @api_router.get("/safety-officer")
@@ -965,83 +1773,980 @@ async def get_safety_officer():
         ]
     })
     if safety_officer:
-        return Participant(**parse_from_mongo(safety_officer))
+        return Participant(**parse_from_mongo(safety_officer, Participant))
     return None
+
+# Scenario timeline
+# scenario_time is free text: relative ("T+30 minutes", "T+1h 15m", "T+01:30",
+# "T-15") or a clock time ("14:30", "2:30 PM", "Day 2 09:00"). It is normalized to
+# scenario_offset_seconds, counted from the exercise's start_time, whenever an
+# event or the exercise start changes, so injects can be ordered by an index.
+SCENARIO_UNIT_SECONDS = {
+    "d": 86400, "day": 86400, "days": 86400,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+}
+RELATIVE_SCENARIO_TIME = re.compile(r"^T\s*(?:([+-])\s*(.*))?$", re.IGNORECASE)
+CLOCK_SCENARIO_TIME = re.compile(
+    r"^(?:(?:day|d)\s*(\d+)\s*,?\s+)?(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([ap])?\.?\s*(?:m\.?)?$", re.IGNORECASE
+)
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]+)", re.IGNORECASE)
+
+def parse_duration(text: str) -> Optional[float]:
+    """Seconds in "30", "30 minutes", "1h 15m", "1 hour and 5 minutes" or "01:30" (bare numbers are minutes)"""
+    text = text.strip().lower()
+    if not text:
+        return 0
+    if re.fullmatch(r"\d+(?:\.\d+)?", text):
+        return float(text) * 60
+    clock = re.fullmatch(r"(\d+):(\d{2})(?::(\d{2}))?", text)
+    if clock:
+        return int(clock.group(1)) * 3600 + int(clock.group(2)) * 60 + int(clock.group(3) or 0)
+    text = re.sub(r"\band\b|,", " ", text)
+    if not re.fullmatch(r"(?:\s*\d+(?:\.\d+)?\s*[a-z]+\s*)+", text):
+        return None
+    total = 0.0
+    for amount, unit in DURATION_PART.findall(text):
+        if unit not in SCENARIO_UNIT_SECONDS:
+            return None
+        total += float(amount) * SCENARIO_UNIT_SECONDS[unit]
+    return total
+
+def parse_scenario_time(scenario_time: Optional[str], start_seconds: Optional[int]) -> Optional[int]:
+    """Offset in seconds from exercise start, or None when scenario_time is not a recognizable time"""
+    if not scenario_time:
+        return None
+    value = scenario_time.strip()
+    relative = RELATIVE_SCENARIO_TIME.match(value)
+    if relative:
+        sign, rest = relative.groups()
+        seconds = parse_duration(rest or "")
+        if seconds is None:
+            return None
+        return int(round(-seconds if sign == "-" else seconds))
+    clock = CLOCK_SCENARIO_TIME.match(value)
+    if not clock:
+        return None
+    day, hour, minute, second, meridiem = clock.groups()
+    hour, minute, second = int(hour), int(minute), int(second or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    offset = hour * 3600 + minute * 60 + second - (start_seconds or 0)
+    if day:
+        return offset + (int(day) - 1) * 86400
+    # A clock time earlier than the start belongs to the next day
+    return offset + 86400 if offset < 0 else offset
+
+async def exercise_start_seconds(exercise_id: str) -> Optional[int]:
+    if not exercise_id:
+        return None
+    exercise = await db.exercise_builder.find_one({"id": exercise_id}, {"_id": 0, "start_time": 1})
+    start = string_to_time(exercise.get("start_time", "")) if exercise else None
+    return start.hour * 3600 + start.minute * 60 if start else None
+
+async def retime_msel_events(exercise_id: Optional[str] = None) -> int:
+    """Recompute scenario_offset_seconds, for one exercise or every event"""
+    query = {"exercise_id": exercise_id} if exercise_id is not None else {}
+    projection = {"_id": 0, "id": 1, "exercise_id": 1, "scenario_time": 1, "scenario_offset_seconds": 1}
+    starts = {}
+    operations = []
+    updated = 0
+    async for event in db.msel_events.find(query, projection):
+        event_exercise = event.get("exercise_id", "")
+        if event_exercise not in starts:
+            starts[event_exercise] = await exercise_start_seconds(event_exercise)
+        offset = parse_scenario_time(event.get("scenario_time"), starts[event_exercise])
+        if "scenario_offset_seconds" not in event or event["scenario_offset_seconds"] != offset:
+            operations.append(UpdateOne({"id": event["id"]}, {"$set": {"scenario_offset_seconds": offset}}))
+        if len(operations) >= 500:
+            updated += (await db.msel_events.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await db.msel_events.bulk_write(operations, ordered=False)).modified_count
+    for timeline_exercise in ([exercise_id] if exercise_id is not None else list(active_timelines)):
+        notify_timeline(timeline_exercise)
+    return updated
+
+# Timeline scheduler
+# A running exercise keeps a heap of its pending injects keyed by offset; one task
+# per exercise sleeps until the earliest is due and announces it on the live
+# channel as "msel.due". MSEL writes mark the heap dirty so it is reloaded from
+# the (exercise_id, completed, scenario_offset_seconds) index. Every worker runs
+# the schedulers of all running exercises for its own live clients, following
+# exercise_timelines so a start or stop in one worker reaches the others.
+TIMELINE_SYNC_SECONDS = 5
+
+class ExerciseTimeline:
+    def __init__(self, exercise_id: str, started_at: datetime):
+        self.exercise_id = exercise_id
+        self.started_at = started_at
+        self.heap = []
+        self.announced = {}  # event id -> offset it was announced at
+        self.dirty = True
+        self.wake = asyncio.Event()
+        self.task = None
+
+    def elapsed(self, now: Optional[datetime] = None) -> float:
+        return ((now or datetime.now(timezone.utc)) - self.started_at).total_seconds()
+
+    def changed(self):
+        self.dirty = True
+        self.wake.set()
+
+    async def reload(self):
+        query = {"exercise_id": self.exercise_id, "completed": False, "scenario_offset_seconds": {"$type": "number"}}
+        projection = {"_id": 0, "id": 1, "event_number": 1, "scenario_offset_seconds": 1}
+        events = await db.msel_events.find(query, projection).sort(
+            [("scenario_offset_seconds", ASCENDING), ("event_number", ASCENDING)]
+        ).to_list(length=None)
+        # An inject is announced once per offset; retiming it schedules it again
+        pending = {event["id"] for event in events}
+        self.announced = {event_id: offset for event_id, offset in self.announced.items() if event_id in pending}
+        self.heap = [
+            (event["scenario_offset_seconds"], event.get("event_number", 0), event["id"]) for event in events
+            if self.announced.get(event["id"]) != event["scenario_offset_seconds"]
+        ]
+        heapq.heapify(self.heap)
+
+    async def run(self):
+        while True:
+            try:
+                if self.dirty:
+                    self.dirty = False
+                    await self.reload()
+                elapsed = self.elapsed()
+                due = []
+                while self.heap and self.heap[0][0] <= elapsed:
+                    due.append(heapq.heappop(self.heap))
+                if due:
+                    self.announced.update((event_id, offset) for offset, _, event_id in due)
+                    exercise_events.publish(self.exercise_id, {
+                        "type": "msel.due",
+                        "exercise_id": self.exercise_id,
+                        "ids": [event_id for _, _, event_id in due],
+                        "elapsed_seconds": int(elapsed),
+                    })
+                timeout = self.heap[0][0] - elapsed if self.heap else None
+                try:
+                    await asyncio.wait_for(self.wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self.wake.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Timeline scheduler for exercise {self.exercise_id} failed: {e}")
+                self.dirty = True
+                await asyncio.sleep(5)
+
+active_timelines = {}
+timeline_sync_task = None
+
+def launch_timeline(exercise_id: str, started_at: datetime) -> ExerciseTimeline:
+    if started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    timeline = ExerciseTimeline(exercise_id, started_at)
+    timeline.task = asyncio.create_task(timeline.run())
+    active_timelines[exercise_id] = timeline
+    return timeline
+
+def halt_timeline(exercise_id: str):
+    timeline = active_timelines.pop(exercise_id, None)
+    if timeline is not None:
+        timeline.task.cancel()
+
+def notify_timeline(exercise_id: str):
+    timeline = active_timelines.get(exercise_id)
+    if timeline is not None:
+        timeline.changed()
+
+async def sync_timelines():
+    """Run exactly the timelines stored in exercise_timelines, reloading those already running"""
+    runs = {run["exercise_id"]: parse_datetime(run["started_at"])
+            async for run in db.exercise_timelines.find({}, {"_id": 0, "exercise_id": 1, "started_at": 1})}
+    for exercise_id in set(active_timelines) - set(runs):
+        halt_timeline(exercise_id)
+    for exercise_id, started_at in runs.items():
+        timeline = active_timelines.get(exercise_id)
+        if timeline is not None and timeline.started_at == started_at:
+            # Picks up MSEL edits made through other workers
+            timeline.changed()
+            continue
+        halt_timeline(exercise_id)
+        launch_timeline(exercise_id, started_at)
+
+async def follow_timelines():
+    while True:
+        try:
+            await sync_timelines()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Timeline sync failed: {e}")
+        await asyncio.sleep(TIMELINE_SYNC_SECONDS)
+
+async def timeline_elapsed(exercise_id: str, elapsed: Optional[int]) -> float:
+    """Elapsed exercise seconds from the caller, this process's scheduler or the stored run"""
+    if elapsed is not None:
+        return elapsed
+    if exercise_id in active_timelines:
+        return active_timelines[exercise_id].elapsed()
+    run = await db.exercise_timelines.find_one({"exercise_id": exercise_id}, {"_id": 0, "started_at": 1})
+    if not run:
+        raise HTTPException(status_code=409, detail="Exercise timeline is not running; start it or pass elapsed=")
+    started_at = run["started_at"]
+    if started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - started_at).total_seconds()
+
+# MSEL ordering
+# Events are ordered by a fractional sort_key. New events default to
+# event_number * MSEL_SORT_KEY_GAP, an insert or move takes the midpoint of its
+# neighbours, and only when floating point runs out of room between two keys is
+# the exercise rebalanced back to evenly spaced keys in one bulk_write.
+MSEL_SORT_KEY_GAP = 1024.0
+MSEL_ORDER = [("sort_key", ASCENDING), ("event_number", ASCENDING)]
+
+def default_sort_key(event_number: int) -> float:
+    return event_number * MSEL_SORT_KEY_GAP
+
+async def ensure_sort_keys(exercise_id: Optional[str] = None) -> int:
+    """Give events written before sort_key existed their default key"""
+    missing = {"sort_key": None} if exercise_id is None else {"exercise_id": exercise_id, "sort_key": None}
+    result = await db.msel_events.update_many(
+        missing, [{"$set": {"sort_key": {"$multiply": [{"$ifNull": ["$event_number", 0]}, MSEL_SORT_KEY_GAP]}}}]
+    )
+    return result.modified_count
+
+async def rebalance_msel_order(exercise_id: str, ordered_ids: Optional[List[str]] = None,
+                               renumber: bool = False) -> int:
+    """Respace sort keys in current (or the given) order, optionally renumbering events 1..n"""
+    events = await db.msel_events.find(
+        {"exercise_id": exercise_id}, {"_id": 0, "id": 1, "event_number": 1, "sort_key": 1}
+    ).sort(MSEL_ORDER).to_list(length=None)
+    if ordered_ids is not None:
+        by_id = {event["id"]: event for event in events}
+        events = [by_id[event_id] for event_id in ordered_ids]
+    now = datetime.now(timezone.utc)
+    operations = []
+    for position, event in enumerate(events, start=1):
+        changes = {}
+        if event.get("sort_key") != default_sort_key(position):
+            changes["sort_key"] = default_sort_key(position)
+        if renumber and event.get("event_number") != position:
+            changes["event_number"] = position
+        if changes:
+            operations.append(UpdateOne({"id": event["id"]}, {"$set": {**changes, "updated_at": now}}))
+    if operations:
+        await db.msel_events.bulk_write(operations, ordered=False)
+    if renumber and events:
+        await advance_sequence("msel_events", exercise_id, len(events))
+    return len(operations)
+
+def sort_key_midpoint(lower: float, upper: float) -> Optional[float]:
+    """The key halfway between two neighbours, or None once floats cannot split the gap"""
+    midpoint = (lower + upper) / 2
+    return midpoint if lower < midpoint < upper else None
+
+async def sort_key_between(exercise_id: str, after_id: Optional[str], before_id: Optional[str]) -> float:
+    """A sort key that places an event after after_id and/or before before_id"""
+    for _ in range(2):
+        await ensure_sort_keys(exercise_id)
+        lower = upper = None
+        if after_id:
+            anchor = await db.msel_events.find_one({"id": after_id, "exercise_id": exercise_id}, {"sort_key": 1})
+            if anchor is None:
+                raise HTTPException(status_code=404, detail="after_event_id is not an event of this exercise")
+            lower = anchor["sort_key"]
+        if before_id:
+            anchor = await db.msel_events.find_one({"id": before_id, "exercise_id": exercise_id}, {"sort_key": 1})
+            if anchor is None:
+                raise HTTPException(status_code=404, detail="before_event_id is not an event of this exercise")
+            upper = anchor["sort_key"]
+        if lower is not None and upper is None:
+            neighbour = await db.msel_events.find_one(
+                {"exercise_id": exercise_id, "sort_key": {"$gt": lower}}, {"sort_key": 1}, sort=MSEL_ORDER
+            )
+            upper = neighbour["sort_key"] if neighbour else None
+        elif upper is not None and lower is None:
+            neighbour = await db.msel_events.find_one(
+                {"exercise_id": exercise_id, "sort_key": {"$lt": upper}}, {"sort_key": 1},
+                sort=[("sort_key", DESCENDING), ("event_number", DESCENDING)]
+            )
+            lower = neighbour["sort_key"] if neighbour else None
+        if lower is not None and upper is not None and lower >= upper:
+            raise HTTPException(status_code=400, detail="after_event_id must come before before_event_id")
+        if upper is None:
+            return (lower or 0.0) + MSEL_SORT_KEY_GAP
+        if lower is None:
+            return upper - MSEL_SORT_KEY_GAP
+        midpoint = sort_key_midpoint(lower, upper)
+        if midpoint is not None:
+            return midpoint
+        await rebalance_msel_order(exercise_id)
+    raise HTTPException(status_code=500, detail="Could not find room between MSEL events")
+
+async def sort_key_for_event_number(exercise_id: str, event_id: str, event_number: int) -> float:
+    """A sort key that places a renumbered event after the events numbered at or below it"""
+    others = {"exercise_id": exercise_id, "id": {"$ne": event_id}}
+    previous = await db.msel_events.find_one(
+        {**others, "event_number": {"$lte": event_number}}, {"id": 1},
+        sort=[("event_number", DESCENDING), ("sort_key", DESCENDING)]
+    )
+    if previous:
+        return await sort_key_between(exercise_id, previous["id"], None)
+    first = await db.msel_events.find_one(others, {"id": 1}, sort=MSEL_ORDER)
+    if first:
+        return await sort_key_between(exercise_id, None, first["id"])
+    return default_sort_key(event_number)
+
 @api_router.get("/msel", response_model=List[MSELEvent])
-async def get_msel_events():
-    events = await db.msel_events.find().to_list(1000)
-    return [MSELEvent(**parse_from_mongo(event)) for event in events]
+async def get_msel_events(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    if wants_ndjson(request, stream):
+        return ndjson_response(db.msel_events, {}, MSELEvent)
+    events = await fetch_page(db.msel_events, {}, limit, after, response)
+    return fast_list_response(MSELEvent, events, headers=dict(response.headers))
 
 @api_router.get("/msel/{exercise_id}", response_model=List[MSELEvent])
-async def get_msel_events_by_exercise(exercise_id: str):
-    events = await db.msel_events.find({"exercise_id": exercise_id}).to_list(1000)
-    return [MSELEvent(**parse_from_mongo(event)) for event in events]
+async def get_msel_events_by_exercise(exercise_id: str, request: Request, stream: bool = False):
+    if wants_ndjson(request, stream):
+        return ndjson_response(db.msel_events, {"exercise_id": exercise_id}, MSELEvent, sort=MSEL_ORDER)
+    events = await db.msel_events.find({"exercise_id": exercise_id}).sort(MSEL_ORDER).to_list(1000)
+    return fast_list_response(MSELEvent, events)
 
 @api_router.get("/msel/event/{event_id}", response_model=MSELEvent)
 async def get_msel_event(event_id: str):
     event = await db.msel_events.find_one({"id": event_id})
     if not event:
         raise HTTPException(status_code=404, detail="MSEL event not found")
-    return MSELEvent(**parse_from_mongo(event))
+    return MSELEvent(**parse_from_mongo(event, MSELEvent))
 
 @api_router.post("/msel", response_model=MSELEvent)
 async def create_msel_event(event_data: MSELEventCreate):
-    event = MSELEvent(**event_data.dict())
-    event_mongo = prepare_for_mongo(event.dict())
+    event_dict = event_data.dict()
+    after_event_id = event_dict.pop("after_event_id")
+    if event_dict["event_number"] is None:
+        event_dict["event_number"] = await next_sequence("msel_events", event_data.exercise_id)
+    else:
+        await advance_sequence("msel_events", event_data.exercise_id, event_dict["event_number"])
+    if after_event_id:
+        event_dict["sort_key"] = await sort_key_between(event_data.exercise_id, after_event_id, None)
+    else:
+        event_dict["sort_key"] = default_sort_key(event_dict["event_number"])
+    event_dict["scenario_offset_seconds"] = parse_scenario_time(
+        event_dict["scenario_time"], await exercise_start_seconds(event_data.exercise_id)
+    )
+    event = MSELEvent(**event_dict)
+    event_mongo = prepare_for_mongo(event.dict(), MSELEvent)
     await db.msel_events.insert_one(event_mongo)
+    exercise_events.publish_change("msel_events", "created", event_mongo)
+    notify_timeline(event.exercise_id)
     return event
 
 @api_router.put("/msel/event/{event_id}", response_model=MSELEvent)
 async def update_msel_event(event_id: str, event_data: MSELEventUpdate):
     update_dict = {k: v for k, v in event_data.dict().items() if v is not None}
     update_dict["updated_at"] = datetime.now(timezone.utc)
-    update_mongo = prepare_for_mongo(update_dict)
+    current = await db.msel_events.find_one({"id": event_id}, {"_id": 0, "exercise_id": 1, "event_number": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="MSEL event not found")
+    exercise_id = current.get("exercise_id", "")
+    if "scenario_time" in update_dict:
+        update_dict["scenario_offset_seconds"] = parse_scenario_time(
+            update_dict["scenario_time"], await exercise_start_seconds(exercise_id)
+        )
+    if update_dict.get("event_number", current.get("event_number")) != current.get("event_number"):
+        # Keep the MSEL order in step with the number the user typed
+        await advance_sequence("msel_events", exercise_id, update_dict["event_number"])
+        update_dict["sort_key"] = await sort_key_for_event_number(exercise_id, event_id, update_dict["event_number"])
+    update_mongo = prepare_for_mongo(update_dict, MSELEvent)
     
-    result = await db.msel_events.update_one(
+    event = await db.msel_events.find_one_and_update(
         {"id": event_id},
-        {"$set": update_mongo}
+        {"$set": update_mongo},
+        return_document=ReturnDocument.AFTER
     )
-    if result.matched_count == 0:
+    if event is None:
         raise HTTPException(status_code=404, detail="MSEL event not found")
     
-    return await get_msel_event(event_id)
+    exercise_events.publish_change("msel_events", "updated", event, sorted(update_mongo))
+    notify_timeline(event.get("exercise_id", ""))
+    return MSELEvent(**parse_from_mongo(event, MSELEvent))
 
 @api_router.delete("/msel/event/{event_id}")
 async def delete_msel_event(event_id: str):
-    result = await db.msel_events.delete_one({"id": event_id})
-    if result.deleted_count == 0:
+    event = await db.msel_events.find_one_and_delete({"id": event_id}, {"id": 1, "exercise_id": 1})
+    if event is None:
         raise HTTPException(status_code=404, detail="MSEL event not found")
+    exercise_events.publish_change("msel_events", "deleted", event)
+    notify_timeline(event.get("exercise_id", ""))
     return {"message": "MSEL event deleted successfully"}
 
+# MSEL reordering endpoints
+class MSELReorder(BaseModel):
+    event_ids: List[str]  # Every event of the exercise, in the new order
+    renumber: bool = True  # Also rewrite event_number to 1..n
+
+class MSELMove(BaseModel):
+    after_event_id: Optional[str] = None
+    before_event_id: Optional[str] = None
+
+@api_router.put("/msel/{exercise_id}/order")
+async def reorder_msel_events(exercise_id: str, reorder: MSELReorder):
+    """Apply a whole new MSEL order, writing only the events whose key or number changes"""
+    existing = {event["id"] async for event in db.msel_events.find({"exercise_id": exercise_id}, {"_id": 0, "id": 1})}
+    if len(set(reorder.event_ids)) != len(reorder.event_ids) or set(reorder.event_ids) != existing:
+        raise HTTPException(status_code=400, detail="event_ids must list every event of the exercise exactly once")
+    updated = await rebalance_msel_order(exercise_id, reorder.event_ids, renumber=reorder.renumber)
+    if updated:
+        exercise_events.publish(exercise_id, {"type": "resync", "exercise_id": exercise_id})
+        notify_timeline(exercise_id)
+    return {"message": "MSEL order updated", "updated": updated}
+
+@api_router.post("/msel/event/{event_id}/move", response_model=MSELEvent)
+async def move_msel_event(event_id: str, move: MSELMove):
+    """Move one event between two neighbours by giving it a fractional sort key"""
+    if not move.after_event_id and not move.before_event_id:
+        raise HTTPException(status_code=400, detail="Provide after_event_id or before_event_id")
+    if event_id in (move.after_event_id, move.before_event_id):
+        raise HTTPException(status_code=400, detail="An event cannot be moved relative to itself")
+    current = await db.msel_events.find_one({"id": event_id}, {"_id": 0, "exercise_id": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="MSEL event not found")
+    sort_key = await sort_key_between(current.get("exercise_id", ""), move.after_event_id, move.before_event_id)
+    event = await db.msel_events.find_one_and_update(
+        {"id": event_id},
+        {"$set": {"sort_key": sort_key, "updated_at": datetime.now(timezone.utc)}},
+        return_document=ReturnDocument.AFTER
+    )
+    exercise_events.publish_change("msel_events", "updated", event, ["sort_key", "updated_at"])
+    return MSELEvent(**parse_from_mongo(event, MSELEvent))
+
+# MSEL spreadsheet import/export
+# Rows are validated against MSELEventCreate a chunk at a time and written with
+# unordered insert_many, so one bad row never blocks the rest; the export writes
+# the same columns back out, letting an MSEL round-trip through a spreadsheet.
+MSEL_IMPORT_CHUNK_ROWS = 500
+MSEL_EXPORT_COLUMNS = [
+    "id", "event_number", "scenario_time", "event_type", "inject_mode", "from_entity", "to_entity",
+    "message", "expected_response", "objective_capability_task", "notes", "completed", "actual_time",
+]
+MSEL_COLUMN_ALIASES = {
+    "#": "event_number", "event_#": "event_number", "event_no": "event_number", "number": "event_number",
+    "time": "scenario_time", "type": "event_type", "mode": "inject_mode",
+    "from": "from_entity", "to": "to_entity", "inject": "message",
+    "expected_player_response": "expected_response", "response": "expected_response",
+    "objective": "objective_capability_task", "objective/capability/task": "objective_capability_task",
+}
+SPREADSHEET_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def msel_column(header) -> Optional[str]:
+    key = str(header).strip().lower().replace(" ", "_")
+    if key in MSEL_EXPORT_COLUMNS:
+        return key
+    return MSEL_COLUMN_ALIASES.get(key)
+
+def msel_import_row(row: dict) -> dict:
+    """Spreadsheet cells to MSELEventCreate input, dropping blanks and export escaping"""
+    data = {}
+    for column, value in row.items():
+        if value is None or value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+            continue
+        if column == "event_number" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            data[column] = int(value)
+            continue
+        if column == "completed" and isinstance(value, bool):
+            data[column] = value
+            continue
+        if isinstance(value, time):
+            # Excel stores "14:30" as a time of day
+            value = value.strftime("%H:%M")
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        value = str(value).strip()
+        if not value:
+            continue
+        if value.startswith("'") and value[1:].startswith(SPREADSHEET_FORMULA_PREFIXES):
+            value = value[1:]
+        data[column] = value
+    if isinstance(data.get("event_number"), str) and re.fullmatch(r"\d+\.0+", data["event_number"]):
+        data["event_number"] = data["event_number"].split(".")[0]
+    if isinstance(data.get("completed"), str):
+        data["completed"] = data["completed"].lower() in ("true", "yes", "y", "1", "x", "done")
+    return data
+
+def spreadsheet_cell(value):
+    """Keep text that looks like a formula from being evaluated when the export is opened"""
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(SPREADSHEET_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+@api_router.post("/msel/{exercise_id}/import")
+async def import_msel_events(exercise_id: str, file: UploadFile = File(...)):
+    """Bulk-create MSEL events from a CSV/XLSX sheet, reporting rows that fail validation
+
+    Rows whose id column names an event of this exercise update that event, so an
+    exported MSEL can be edited and imported back; any other row becomes a new event."""
+    chunks = iter_spreadsheet_chunks(file.file, file.filename or "", MSEL_IMPORT_CHUNK_ROWS)
+    start_seconds = await exercise_start_seconds(exercise_id)
+    inserted = updated = 0
+    errors = []
+    row_number = 1  # the header row
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        columns = {column: msel_column(column) for column in chunk.columns}
+        chunk = chunk[[column for column, field in columns.items() if field]].rename(columns=columns)
+        rows = []
+        for record in chunk.to_dict("records"):
+            row_number += 1
+            data = msel_import_row(record)
+            if not data:
+                continue
+            event_id = data.pop("id", None)
+            completed = data.pop("completed", False)
+            actual_time = data.pop("actual_time", None)
+            try:
+                event_data = MSELEventCreate(**{**data, "exercise_id": exercise_id})
+            except ValidationError as e:
+                errors.append({"row": row_number, "errors": [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ]})
+                continue
+            rows.append((row_number, event_id, event_data, bool(completed), actual_time))
+        if not rows:
+            continue
+
+        row_ids = [event_id for _, event_id, _, _, _ in rows if event_id]
+        existing = {
+            event["id"]: event for event in await db.msel_events.find(
+                {"exercise_id": exercise_id, "id": {"$in": row_ids}}, {"_id": 0, "id": 1, "event_number": 1}
+            ).to_list(length=None)
+        } if row_ids else {}
+        unnumbered = [
+            event_data for _, event_id, event_data, _, _ in rows
+            if event_data.event_number is None and event_id not in existing
+        ]
+        if unnumbered:
+            first = await reserve_sequence("msel_events", exercise_id, len(unnumbered))
+            for offset, event_data in enumerate(unnumbered):
+                event_data.event_number = first + offset
+        numbered = [event_data.event_number for _, _, event_data, _, _ in rows if event_data.event_number is not None]
+        if numbered:
+            await advance_sequence("msel_events", exercise_id, max(numbered))
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        for _, event_id, event_data, completed, actual_time in rows:
+            fields = {
+                **event_data.dict(exclude={"after_event_id"}),
+                "completed": completed,
+                "actual_time": actual_time,
+                "scenario_offset_seconds": parse_scenario_time(event_data.scenario_time, start_seconds),
+            }
+            current = existing.get(event_id)
+            if current is None:
+                event = MSELEvent(**fields, sort_key=default_sort_key(event_data.event_number))
+                operations.append(InsertOne(prepare_for_mongo(event.dict(), MSELEvent)))
+                continue
+            if event_data.event_number is None:
+                fields.pop("event_number")
+            elif event_data.event_number != current.get("event_number"):
+                fields["sort_key"] = default_sort_key(event_data.event_number)
+            fields["updated_at"] = now
+            operations.append(UpdateOne(
+                {"id": event_id, "exercise_id": exercise_id}, {"$set": prepare_for_mongo(fields, MSELEvent)}
+            ))
+        try:
+            result = await db.msel_events.bulk_write(operations, ordered=False)
+            inserted += result.inserted_count
+            updated += result.matched_count
+        except BulkWriteError as e:
+            inserted += e.details["nInserted"]
+            updated += e.details["nMatched"]
+            errors.extend(
+                {"row": rows[error["index"]][0], "errors": [error["errmsg"]]}
+                for error in e.details["writeErrors"]
+            )
+
+    if inserted or updated:
+        # Clients refetch once rather than receive hundreds of per-row events
+        exercise_events.publish(exercise_id, {"type": "resync", "exercise_id": exercise_id})
+        notify_timeline(exercise_id)
+    return {
+        "message": f"Imported {inserted} new and {updated} existing MSEL events, {len(errors)} rows rejected",
+        "inserted": inserted,
+        "updated": updated,
+        "rejected": len(errors),
+        "errors": errors,
+    }
+
+def write_msel_workbook(events: list) -> bytes:
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("MSEL")
+    sheet.append(MSEL_EXPORT_COLUMNS)
+    for event in events:
+        sheet.append([spreadsheet_cell(event.get(column)) for column in MSEL_EXPORT_COLUMNS])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+@api_router.get("/msel/{exercise_id}/export")
+async def export_msel_events(exercise_id: str, format: str = "csv"):
+    """Download an exercise MSEL in event order as CSV (streamed) or XLSX"""
+    if format not in ("csv", "xlsx"):
+        raise HTTPException(status_code=400, detail="format must be csv or xlsx")
+    cursor = db.msel_events.find(
+        {"exercise_id": exercise_id}, {"_id": 0, **{column: 1 for column in MSEL_EXPORT_COLUMNS}}
+    ).sort(MSEL_ORDER)
+    headers = {"Content-Disposition": f'attachment; filename="msel-{quote(exercise_id)}.{format}"'}
+
+    if format == "xlsx":
+        events = await cursor.to_list(length=None)
+        content = await asyncio.to_thread(write_msel_workbook, events)
+        return Response(
+            content=content,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers=headers
+        )
+
+    async def rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(MSEL_EXPORT_COLUMNS)
+        batch = 0
+        async for event in cursor.batch_size(STREAM_BATCH_SIZE):
+            writer.writerow([spreadsheet_cell(event.get(column)) for column in MSEL_EXPORT_COLUMNS])
+            batch += 1
+            if batch >= STREAM_BATCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                batch = 0
+        yield buffer.getvalue()
+
+    return StreamingResponse(rows(), media_type="text/csv", headers=headers)
+
+# Scenario timeline endpoints
+class TimelineStart(BaseModel):
+    started_at: Optional[datetime] = None  # Defaults to now
+
+class TimelineStatus(BaseModel):
+    exercise_id: str
+    running: bool
+    started_at: Optional[datetime] = None
+    elapsed_seconds: Optional[int] = None
+    next_offset_seconds: Optional[int] = None
+
+def timeline_query(exercise_id: str, offsets: dict) -> dict:
+    return {"exercise_id": exercise_id, "completed": False, "scenario_offset_seconds": {"$type": "number", **offsets}}
+
+@api_router.post("/exercises/{exercise_id}/timeline/start", response_model=TimelineStatus)
+async def start_exercise_timeline(exercise_id: str, start: Optional[TimelineStart] = None):
+    """Start (or restart) announcing this exercise's injects as they come due"""
+    started_at = (start.started_at if start else None) or datetime.now(timezone.utc)
+    # BSON dates keep milliseconds; other workers compare against the stored value
+    started_at = started_at.replace(microsecond=started_at.microsecond // 1000 * 1000)
+    await db.exercise_timelines.update_one(
+        {"exercise_id": exercise_id}, {"$set": {"exercise_id": exercise_id, "started_at": started_at}}, upsert=True
+    )
+    halt_timeline(exercise_id)
+    launch_timeline(exercise_id, started_at)
+    return await get_exercise_timeline(exercise_id)
+
+@api_router.post("/exercises/{exercise_id}/timeline/stop")
+async def stop_exercise_timeline(exercise_id: str):
+    halt_timeline(exercise_id)
+    result = await db.exercise_timelines.delete_one({"exercise_id": exercise_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Exercise timeline is not running")
+    return {"message": "Exercise timeline stopped"}
+
+@api_router.get("/exercises/{exercise_id}/timeline", response_model=TimelineStatus)
+async def get_exercise_timeline(exercise_id: str):
+    run = await db.exercise_timelines.find_one({"exercise_id": exercise_id}, {"_id": 0})
+    if not run:
+        return TimelineStatus(exercise_id=exercise_id, running=False)
+    elapsed = await timeline_elapsed(exercise_id, None)
+    upcoming = await db.msel_events.find_one(
+        timeline_query(exercise_id, {"$gt": elapsed}),
+        {"_id": 0, "scenario_offset_seconds": 1},
+        sort=[("scenario_offset_seconds", ASCENDING)]
+    )
+    return TimelineStatus(
+        exercise_id=exercise_id,
+        running=True,
+        started_at=run["started_at"],
+        elapsed_seconds=int(elapsed),
+        next_offset_seconds=upcoming["scenario_offset_seconds"] if upcoming else None
+    )
+
+@api_router.get("/exercises/{exercise_id}/timeline/due", response_model=List[MSELEvent])
+async def get_due_injects(
+    exercise_id: str,
+    elapsed: Optional[int] = Query(None, description="Exercise seconds elapsed; defaults to the running timeline"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Incomplete injects whose scenario time has been reached, oldest first"""
+    elapsed_seconds = await timeline_elapsed(exercise_id, elapsed)
+    events = await db.msel_events.find(timeline_query(exercise_id, {"$lte": elapsed_seconds})).sort(
+        [("scenario_offset_seconds", ASCENDING), ("event_number", ASCENDING)]
+    ).to_list(limit)
+    return fast_list_response(MSELEvent, events)
+
+@api_router.get("/exercises/{exercise_id}/timeline/next", response_model=List[MSELEvent])
+async def get_next_injects(
+    exercise_id: str,
+    n: int = Query(5, ge=1, le=100),
+    elapsed: Optional[int] = Query(None, description="Exercise seconds elapsed; defaults to the running timeline")
+):
+    """The next n injects that are not due yet"""
+    elapsed_seconds = await timeline_elapsed(exercise_id, elapsed)
+    events = await db.msel_events.find(timeline_query(exercise_id, {"$gt": elapsed_seconds})).sort(
+        [("scenario_offset_seconds", ASCENDING), ("event_number", ASCENDING)]
+    ).to_list(n)
+    return fast_list_response(MSELEvent, events)
+
+# HIRA risk scoring
+# Risk score is frequency x the worst of the human and property impact categories,
+# matching the scale the HIRA screen has always displayed.
+RISK_IMPACT_FIELDS = ("fatalities", "injuries", "evacuation", "property_damage")
+RISK_LEVEL_THRESHOLDS = [(15, "Critical"), (10, "High"), (5, "Medium")]
+RISK_LEVELS = ["Low", "Medium", "High", "Critical"]
+
+def risk_level_for(score: int) -> str:
+    for threshold, level in RISK_LEVEL_THRESHOLDS:
+        if score >= threshold:
+            return level
+    return "Low"
+
+def score_hira_entry(data: dict) -> dict:
+    """Set max_impact, risk_score and risk_level on a HIRA document"""
+    max_impact = max(int(data.get(field) or 0) for field in RISK_IMPACT_FIELDS)
+    data["max_impact"] = max_impact
+    data["risk_score"] = int(data.get("frequency") or 0) * max_impact
+    data["risk_level"] = risk_level_for(data["risk_score"])
+    return data
+
+def score_hira_batch(documents: list) -> list:
+    """Vectorized risk scoring for a batch of HIRA documents, returning bulk updates"""
+    frequency = np.array([int(doc.get("frequency") or 0) for doc in documents])
+    impacts = np.array([[int(doc.get(field) or 0) for field in RISK_IMPACT_FIELDS] for doc in documents])
+    max_impact = impacts.max(axis=1)
+    scores = frequency * max_impact
+    levels = np.select(
+        [scores >= threshold for threshold, _ in RISK_LEVEL_THRESHOLDS],
+        [level for _, level in RISK_LEVEL_THRESHOLDS],
+        default="Low"
+    )
+    return [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "max_impact": int(impact), "risk_score": int(score), "risk_level": str(level)
+        }})
+        for doc, impact, score, level in zip(documents, max_impact, scores, levels)
+    ]
+
+# HIRA risk matrix cache
+# Aggregation results are cached per top-N and dropped on every HIRA write; the
+# generation counter keeps a result computed during a write from being cached.
+# Writes made through another worker process are only seen once the TTL expires.
+HIRA_MATRIX_CACHE_TTL_SECONDS = int(os.environ.get("HIRA_MATRIX_CACHE_TTL_SECONDS", "30"))
+hira_matrix_cache = {}
+hira_cache_generation = 0
+
+def invalidate_hira_cache():
+    global hira_cache_generation
+    hira_cache_generation += 1
+    hira_matrix_cache.clear()
+
 # HIRA Routes
 @api_router.get("/hira", response_model=List[HIRAEntry])
-async def get_hira_entries():
+async def get_hira_entries(request: Request, stream: bool = False):
+    if wants_ndjson(request, stream):
+        return ndjson_response(db.hira_entries, {}, HIRAEntry)
     entries = await db.hira_entries.find().to_list(1000)
-    return [HIRAEntry(**parse_from_mongo(entry)) for entry in entries]
+    return fast_list_response(HIRAEntry, entries)
+
+@api_router.get("/hira/summary", response_model=List[HIRAEntrySummary])
+async def get_hira_entries_summary():
+    """List HIRA entries without hazard images"""
+    pipeline = [{"$project": summary_projection(HIRAEntrySummary, has_image=has_image_expr("hazard_image"))}]
+    entries = await db.hira_entries.aggregate(pipeline).to_list(1000)
+    summaries = []
+    for entry in entries:
+        summary = HIRAEntrySummary(**parse_from_mongo(entry, HIRAEntrySummary))
+        if summary.has_image:
+            summary.image_url = f"/api/hira/{summary.id}/image?size=small"
+        summaries.append(summary)
+    return summaries
+
+@api_router.get("/hira/ranked", response_model=List[HIRAEntrySummary])
+async def get_hira_entries_ranked(
+    response: Response,
+    risk_level: Optional[str] = None,
+    disaster_type: Optional[str] = None,
+    min_score: Optional[int] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0)
+):
+    """List HIRA entries sorted, filtered and paginated by stored risk score"""
+    query = {}
+    if risk_level:
+        if risk_level not in RISK_LEVELS:
+            raise HTTPException(status_code=400, detail=f"risk_level must be one of: {', '.join(RISK_LEVELS)}")
+        query["risk_level"] = risk_level
+    if disaster_type:
+        query["disaster_type"] = disaster_type
+    if min_score is not None:
+        query["risk_score"] = {"$gte": min_score}
+
+    direction = DESCENDING if order == "desc" else ASCENDING
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"risk_score": direction, "id": ASCENDING}},
+        {"$skip": offset},
+        {"$limit": limit},
+        {"$project": summary_projection(HIRAEntrySummary, has_image=has_image_expr("hazard_image"))},
+    ]
+    entries, total = await asyncio.gather(
+        db.hira_entries.aggregate(pipeline).to_list(limit),
+        db.hira_entries.count_documents(query)
+    )
+    response.headers["X-Total-Count"] = str(total)
+    summaries = []
+    for entry in entries:
+        summary = HIRAEntrySummary(**parse_from_mongo(entry, HIRAEntrySummary))
+        if summary.has_image:
+            summary.image_url = f"/api/hira/{summary.id}/image?size=small"
+        summaries.append(summary)
+    return summaries
+
+@api_router.get("/hira/risk-matrix")
+async def get_hira_risk_matrix(top: int = Query(10, ge=1, le=100)):
+    """Frequency x consequence heat-map, per disaster type rollups and top risks"""
+    cached = hira_matrix_cache.get(top)
+    if cached and (datetime.now(timezone.utc) - cached[0]).total_seconds() < HIRA_MATRIX_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    generation = hira_cache_generation
+    pipeline = [{"$facet": {
+        "matrix": [
+            {"$group": {
+                "_id": {"frequency": "$frequency", "max_impact": "$max_impact"},
+                "count": {"$sum": 1},
+            }},
+            {"$sort": {"_id.frequency": 1, "_id.max_impact": 1}},
+        ],
+        "by_disaster_type": [
+            {"$group": {
+                "_id": "$disaster_type",
+                "count": {"$sum": 1},
+                "avg_frequency": {"$avg": "$frequency"},
+                "avg_max_impact": {"$avg": "$max_impact"},
+                "avg_risk_score": {"$avg": "$risk_score"},
+                "max_risk_score": {"$max": "$risk_score"},
+            }},
+            {"$sort": {"avg_risk_score": -1, "_id": 1}},
+        ],
+        "by_risk_level": [
+            {"$group": {"_id": "$risk_level", "count": {"$sum": 1}}},
+        ],
+        "top_risks": [
+            {"$sort": {"risk_score": -1, "id": 1}},
+            {"$limit": top},
+            {"$project": {
+                "_id": 0, "id": 1, "name": 1, "disaster_type": 1, "frequency": 1,
+                "max_impact": 1, "risk_score": 1, "risk_level": 1,
+            }},
+        ],
+    }}]
+    facets = (await db.hira_entries.aggregate(pipeline).to_list(1))[0]
+
+    levels = {row["_id"]: row["count"] for row in facets["by_risk_level"]}
+    result = {
+        "matrix": [
+            {"frequency": row["_id"].get("frequency"), "max_impact": row["_id"].get("max_impact"), "count": row["count"]}
+            for row in facets["matrix"]
+        ],
+        "by_disaster_type": [
+            {
+                "disaster_type": row["_id"],
+                "count": row["count"],
+                "avg_frequency": round(row["avg_frequency"] or 0, 2),
+                "avg_max_impact": round(row["avg_max_impact"] or 0, 2),
+                "avg_risk_score": round(row["avg_risk_score"] or 0, 2),
+                "max_risk_score": row["max_risk_score"] or 0,
+            }
+            for row in facets["by_disaster_type"]
+        ],
+        "by_risk_level": {level: levels.get(level, 0) for level in RISK_LEVELS},
+        "top_risks": facets["top_risks"],
+        "total": sum(levels.values()),
+    }
+    if generation == hira_cache_generation:
+        hira_matrix_cache[top] = (datetime.now(timezone.utc), result)
+    return result
+
+@api_router.post("/hira/recompute-risk")
+async def recompute_hira_risk():
+    """Recompute the stored risk fields for every HIRA entry"""
+    projection = {"_id": 1, "frequency": 1, **{field: 1 for field in RISK_IMPACT_FIELDS}}
+    batch, updated = [], 0
+    async for document in db.hira_entries.find({}, projection, batch_size=STREAM_BATCH_SIZE):
+        batch.append(document)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            updated += (await db.hira_entries.bulk_write(score_hira_batch(batch), ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await db.hira_entries.bulk_write(score_hira_batch(batch), ordered=False)).modified_count
+    invalidate_hira_cache()
+    return {"message": "HIRA risk scores recomputed", "updated": updated}
+
+@api_router.get("/hira/{entry_id}/image")
+async def get_hira_entry_image(entry_id: str, size: Optional[str] = None):
+    return await embedded_image_response(db.hira_entries, entry_id, "hazard_image", "HIRA entry not found", size=size)
 
 @api_router.get("/hira/{entry_id}", response_model=HIRAEntry)
 async def get_hira_entry(entry_id: str):
     entry = await db.hira_entries.find_one({"id": entry_id})
     if not entry:
         raise HTTPException(status_code=404, detail="HIRA entry not found")
-    return HIRAEntry(**parse_from_mongo(entry))
+    return HIRAEntry(**parse_from_mongo(entry, HIRAEntry))
 
 @api_router.post("/hira", response_model=HIRAEntry)
 async def create_hira_entry(entry_data: HIRAEntryCreate):
-    entry = HIRAEntry(**entry_data.dict())
-    entry_mongo = prepare_for_mongo(entry.dict())
+    entry = HIRAEntry(**score_hira_entry(await store_embedded_images(entry_data.dict())))
+    entry_mongo = prepare_for_mongo(entry.dict(), HIRAEntry)
     await db.hira_entries.insert_one(entry_mongo)
+    invalidate_hira_cache()
     return entry
 
 @api_router.put("/hira/{entry_id}", response_model=HIRAEntry)
 async def update_hira_entry(entry_id: str, entry_data: HIRAEntryCreate):
-    update_mongo = prepare_for_mongo(entry_data.dict())
+    update_mongo = prepare_for_mongo(score_hira_entry(await store_embedded_images(entry_data.dict())), HIRAEntry)
     result = await db.hira_entries.update_one(
         {"id": entry_id},
         {"$set": update_mongo}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="HIRA entry not found")
+    invalidate_hira_cache()
     return await get_hira_entry(entry_id)
 
 @api_router.delete("/hira/{entry_id}")
@@ -1049,18 +2754,38 @@ async def delete_hira_entry(entry_id: str):
     result = await db.hira_entries.delete_one({"id": entry_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="HIRA entry not found")
+    invalidate_hira_cache()
     return {"message": "HIRA entry deleted successfully"}
 
 # Participant Routes
 @api_router.get("/participants", response_model=List[Participant])
-async def get_participants():
+async def get_participants(request: Request, stream: bool = False):
+    if wants_ndjson(request, stream):
+        return ndjson_response(db.participants, {}, Participant)
     participants = await db.participants.find().to_list(1000)
-    return [Participant(**parse_from_mongo(participant)) for participant in participants]
+    return fast_list_response(Participant, participants)
+
+@api_router.get("/participants/summary", response_model=List[ParticipantSummary])
+async def get_participants_summary():
+    """List participants without profile images"""
+    pipeline = [{"$project": summary_projection(ParticipantSummary, has_image=has_image_expr("profileImage"))}]
+    participants = await db.participants.aggregate(pipeline).to_list(1000)
+    summaries = []
+    for participant in participants:
+        summary = ParticipantSummary(**parse_from_mongo(participant, ParticipantSummary))
+        if summary.has_image:
+            summary.image_url = f"/api/participants/{summary.id}/image?size=small"
+        summaries.append(summary)
+    return summaries
+
+@api_router.get("/participants/{participant_id}/image")
+async def get_participant_image(participant_id: str, size: Optional[str] = None):
+    return await embedded_image_response(db.participants, participant_id, "profileImage", "Participant not found", size=size)
 
 @api_router.post("/participants", response_model=Participant)
 async def create_participant(participant_data: ParticipantCreate):
-    participant = Participant(**participant_data.dict())
-    participant_mongo = prepare_for_mongo(participant.dict())
+    participant = Participant(**await store_embedded_images(participant_data.dict()))
+    participant_mongo = prepare_for_mongo(participant.dict(), Participant)
     await db.participants.insert_one(participant_mongo)
     return participant
 
@@ -1069,11 +2794,11 @@ async def get_participant(participant_id: str):
     participant = await db.participants.find_one({"id": participant_id})
     if not participant:
         raise HTTPException(status_code=404, detail="Participant not found")
-    return Participant(**parse_from_mongo(participant))
+    return Participant(**parse_from_mongo(participant, Participant))
 
 @api_router.put("/participants/{participant_id}", response_model=Participant)
 async def update_participant(participant_id: str, participant_data: ParticipantCreate):
-    update_mongo = prepare_for_mongo(participant_data.dict())
+    update_mongo = prepare_for_mongo(await store_embedded_images(participant_data.dict()), Participant)
     result = await db.participants.update_one(
         {"id": participant_id},
         {"$set": update_mongo}
@@ -1094,7 +2819,7 @@ async def delete_participant(participant_id: str):
 async def get_locations():
     try:
         locations = await db.locations.find().to_list(1000)
-        return [Location(**parse_from_mongo(location)) for location in locations]
+        return [Location(**parse_from_mongo(location, Location)) for location in locations]
     except Exception as e:
         logger.error(f"Error fetching locations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1105,7 +2830,7 @@ async def get_location(location_id: str):
         location = await db.locations.find_one({"id": location_id})
         if not location:
             raise HTTPException(status_code=404, detail="Location not found")
-        return Location(**parse_from_mongo(location))
+        return Location(**parse_from_mongo(location, Location))
     except HTTPException:
         raise
     except Exception as e:
@@ -1116,7 +2841,7 @@ async def get_location(location_id: str):
 async def create_location(location_data: LocationCreate):
     try:
         location = Location(**location_data.dict())
-        location_mongo = prepare_for_mongo(location.dict())
+        location_mongo = prepare_for_mongo(location.dict(), Location)
         await db.locations.insert_one(location_mongo)
         return location
     except Exception as e:
@@ -1138,12 +2863,12 @@ async def update_location(location_id: str, location_data: LocationUpdate):
         # Update location
         await db.locations.update_one(
             {"id": location_id}, 
-            {"$set": prepare_for_mongo(update_data)}
+            {"$set": prepare_for_mongo(update_data, Location)}
         )
         
         # Return updated location
         updated_location = await db.locations.find_one({"id": location_id})
-        return Location(**parse_from_mongo(updated_location))
+        return Location(**parse_from_mongo(updated_location, Location))
     except HTTPException:
         raise
     except Exception as e:
@@ -1181,6 +2906,7 @@ async def create_scribe_template(template: ScribeTemplateCreate):
         
         if result.inserted_id:
             created_template = await db.scribe_templates.find_one({"id": template_dict['id']})
+            exercise_events.publish_change("scribe_templates", "created", created_template)
             return ScribeTemplate(**created_template)
         else:
             raise HTTPException(status_code=400, detail="Failed to create scribe template")
@@ -1189,9 +2915,13 @@ async def create_scribe_template(template: ScribeTemplateCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/scribe-templates", response_model=List[ScribeTemplate])
-async def get_scribe_templates():
+async def get_scribe_templates(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+):
     try:
-        templates = await db.scribe_templates.find().to_list(length=None)
+        templates = await fetch_page(db.scribe_templates, {}, limit, after, response)
         return [ScribeTemplate(**template) for template in templates]
     except Exception as e:
         logger.error(f"Error fetching scribe templates: {e}")
@@ -1234,6 +2964,7 @@ async def update_scribe_template(template_id: str, template_update: ScribeTempla
             raise HTTPException(status_code=404, detail="Scribe template not found")
         
         updated_template = await db.scribe_templates.find_one({"id": template_id})
+        exercise_events.publish_change("scribe_templates", "updated", updated_template, sorted(update_data))
         return ScribeTemplate(**updated_template)
     except HTTPException:
         raise
@@ -1244,9 +2975,10 @@ async def update_scribe_template(template_id: str, template_update: ScribeTempla
 @api_router.delete("/scribe-templates/{template_id}")
 async def delete_scribe_template(template_id: str):
     try:
-        result = await db.scribe_templates.delete_one({"id": template_id})
-        if result.deleted_count == 0:
+        template = await db.scribe_templates.find_one_and_delete({"id": template_id}, {"id": 1, "exercise_id": 1})
+        if template is None:
             raise HTTPException(status_code=404, detail="Scribe template not found")
+        exercise_events.publish_change("scribe_templates", "deleted", template)
         return {"message": "Scribe template deleted successfully"}
     except HTTPException:
         raise
@@ -1258,33 +2990,62 @@ async def delete_scribe_template(template_id: str):
 @api_router.post("/resources", response_model=Resource)
 async def create_resource(resource: ResourceCreate):
     try:
-        resource_data = resource.dict()
+        resource_data = await store_embedded_images(resource.dict())
         resource_data["id"] = str(uuid.uuid4())
         resource_data["created_at"] = datetime.now(timezone.utc)
         resource_data["updated_at"] = datetime.now(timezone.utc)
         
-        await db.resources.insert_one(prepare_for_mongo(resource_data))
+        await db.resources.insert_one(prepare_for_mongo(resource_data, Resource))
         return Resource(**resource_data)
     except Exception as e:
         logger.error(f"Error creating resource: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/resources", response_model=List[Resource])
-async def get_all_resources():
+async def get_all_resources(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    stream: bool = False
+):
+    if wants_ndjson(request, stream):
+        return ndjson_response(db.resources, {}, Resource)
     try:
-        resources = await db.resources.find().to_list(length=None)
-        return [Resource(**parse_from_mongo(resource)) for resource in resources]
+        resources = await fetch_page(db.resources, {}, limit, after, response)
+        return fast_list_response(Resource, resources, headers=dict(response.headers))
     except Exception as e:
         logger.error(f"Error retrieving resources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/resources/summary", response_model=List[ResourceSummary])
+async def get_resources_summary():
+    """List resources without resource images"""
+    try:
+        pipeline = [{"$project": summary_projection(ResourceSummary, has_image=has_image_expr("resource_image"))}]
+        resources = await db.resources.aggregate(pipeline).to_list(length=None)
+        summaries = []
+        for resource in resources:
+            summary = ResourceSummary(**parse_from_mongo(resource, ResourceSummary))
+            if summary.has_image:
+                summary.image_url = f"/api/resources/{summary.id}/image?size=small"
+            summaries.append(summary)
+        return summaries
+    except Exception as e:
+        logger.error(f"Error retrieving resource summaries: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/resources/{resource_id}/image")
+async def get_resource_image(resource_id: str, size: Optional[str] = None):
+    return await embedded_image_response(db.resources, resource_id, "resource_image", "Resource not found", size=size)
+
 @api_router.get("/resources/{resource_id}", response_model=Resource)
 async def get_resource(resource_id: str):
     try:
         resource = await db.resources.find_one({"id": resource_id})
         if not resource:
             raise HTTPException(status_code=404, detail="Resource not found")
-        return Resource(**parse_from_mongo(resource))
+        return Resource(**parse_from_mongo(resource, Resource))
     except HTTPException:
         raise
     except Exception as e:
@@ -1301,17 +3062,18 @@ async def update_resource(resource_id: str, resource_update: ResourceUpdate):
         
         # Prepare update data
         update_data = {k: v for k, v in resource_update.dict().items() if v is not None}
+        update_data = await store_embedded_images(update_data)
         update_data["updated_at"] = datetime.now(timezone.utc)
         
         # Update resource
         await db.resources.update_one(
             {"id": resource_id}, 
-            {"$set": prepare_for_mongo(update_data)}
+            {"$set": prepare_for_mongo(update_data, Resource)}
         )
         
         # Return updated resource
         updated_resource = await db.resources.find_one({"id": resource_id})
-        return Resource(**parse_from_mongo(updated_resource))
+        return Resource(**parse_from_mongo(updated_resource, Resource))
     except HTTPException:
         raise
     except Exception as e:
@@ -1335,12 +3097,12 @@ async def delete_resource(resource_id: str):
 @api_router.post("/evaluation-reports", response_model=EvaluationReport)
 async def create_evaluation_report(report: EvaluationReportCreate):
     try:
-        report_data = report.dict()
+        report_data = await store_embedded_images(report.dict())
         report_data["id"] = str(uuid.uuid4())
         report_data["created_at"] = datetime.now(timezone.utc)
         report_data["updated_at"] = datetime.now(timezone.utc)
         
-        await db.evaluation_reports.insert_one(prepare_for_mongo(report_data))
+        await db.evaluation_reports.insert_one(prepare_for_mongo(report_data, EvaluationReport))
         return EvaluationReport(**report_data)
     except Exception as e:
         logger.error(f"Error creating evaluation report: {e}")
@@ -1350,16 +3112,44 @@ async def create_evaluation_report(report: EvaluationReportCreate):
 async def get_all_evaluation_reports():
     try:
         reports = await db.evaluation_reports.find().to_list(length=None)
-        return [EvaluationReport(**parse_from_mongo(report)) for report in reports]
+        return [EvaluationReport(**parse_from_mongo(report, EvaluationReport)) for report in reports]
     except Exception as e:
         logger.error(f"Error retrieving evaluation reports: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/evaluation-reports/summary", response_model=List[EvaluationReportSummary])
+async def get_evaluation_reports_summary():
+    """List evaluation reports without supporting images"""
+    try:
+        pipeline = [{"$project": summary_projection(
+            EvaluationReportSummary,
+            has_image=has_image_expr("evaluation_images", is_list=True),
+            image_count={"$size": {"$ifNull": ["$evaluation_images", []]}},
+        )}]
+        reports = await db.evaluation_reports.aggregate(pipeline).to_list(length=None)
+        summaries = []
+        for report in reports:
+            summary = EvaluationReportSummary(**parse_from_mongo(report, EvaluationReportSummary))
+            summary.image_urls = [
+                f"/api/evaluation-reports/{summary.id}/images/{index}?size=small" for index in range(summary.image_count)
+            ]
+            summaries.append(summary)
+        return summaries
+    except Exception as e:
+        logger.error(f"Error retrieving evaluation report summaries: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/evaluation-reports/{report_id}/images/{index}")
+async def get_evaluation_report_image(report_id: str, index: int, size: Optional[str] = None):
+    return await embedded_image_response(
+        db.evaluation_reports, report_id, "evaluation_images", "Evaluation report not found", index=index, size=size
+    )
+
 @api_router.get("/evaluation-reports/exercise/{exercise_id}", response_model=List[EvaluationReport])
 async def get_evaluation_reports_by_exercise(exercise_id: str):
     try:
         reports = await db.evaluation_reports.find({"exercise_id": exercise_id}).to_list(length=None)
-        return [EvaluationReport(**parse_from_mongo(report)) for report in reports]
+        return [EvaluationReport(**parse_from_mongo(report, EvaluationReport)) for report in reports]
     except Exception as e:
         logger.error(f"Error retrieving evaluation reports for exercise {exercise_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1370,7 +3160,7 @@ async def get_evaluation_report(report_id: str):
         report = await db.evaluation_reports.find_one({"id": report_id})
         if not report:
             raise HTTPException(status_code=404, detail="Evaluation report not found")
-        return EvaluationReport(**parse_from_mongo(report))
+        return EvaluationReport(**parse_from_mongo(report, EvaluationReport))
     except HTTPException:
         raise
     except Exception as e:
@@ -1387,17 +3177,18 @@ async def update_evaluation_report(report_id: str, report_update: EvaluationRepo
         
         # Prepare update data
         update_data = {k: v for k, v in report_update.dict().items() if v is not None}
+        update_data = await store_embedded_images(update_data)
         update_data["updated_at"] = datetime.now(timezone.utc)
         
         # Update report
         await db.evaluation_reports.update_one(
             {"id": report_id}, 
-            {"$set": prepare_for_mongo(update_data)}
+            {"$set": prepare_for_mongo(update_data, EvaluationReport)}
         )
         
         # Return updated report
         updated_report = await db.evaluation_reports.find_one({"id": report_id})
-        return EvaluationReport(**parse_from_mongo(updated_report))
+        return EvaluationReport(**parse_from_mongo(updated_report, EvaluationReport))
     except HTTPException:
         raise
     except Exception as e:
@@ -1421,24 +3212,14 @@ async def delete_evaluation_report(report_id: str):
 @api_router.post("/lessons-learned", response_model=LessonsLearned)
 async def create_lessons_learned(lesson: LessonsLearnedCreate):
     try:
-        # Get the highest serial number for this exercise and increment
-        existing_lessons = await db.lessons_learned.find(
-            {"exercise_id": lesson.exercise_id}
-        ).to_list(length=None)
-        
-        if existing_lessons:
-            max_serial = max([ll.get("serial_number", 0) for ll in existing_lessons])
-            serial_number = max_serial + 1
-        else:
-            serial_number = 1
-            
-        lesson_data = lesson.dict()
+        serial_number = await next_sequence("lessons_learned", lesson.exercise_id)
+        lesson_data = await store_embedded_images(lesson.dict())
         lesson_data["id"] = str(uuid.uuid4())
         lesson_data["serial_number"] = serial_number
         lesson_data["created_at"] = datetime.now(timezone.utc)
         lesson_data["updated_at"] = datetime.now(timezone.utc)
         
-        lesson_mongo = prepare_for_mongo(lesson_data)
+        lesson_mongo = prepare_for_mongo(lesson_data, LessonsLearned)
         await db.lessons_learned.insert_one(lesson_mongo)
         return LessonsLearned(**lesson_data)
     except Exception as e:
@@ -1446,10 +3227,14 @@ async def create_lessons_learned(lesson: LessonsLearnedCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/lessons-learned", response_model=List[LessonsLearned])
-async def get_all_lessons_learned():
+async def get_all_lessons_learned(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+):
     try:
-        lessons = await db.lessons_learned.find().to_list(length=None)
-        return [LessonsLearned(**parse_from_mongo(lesson)) for lesson in lessons]
+        lessons = await fetch_page(db.lessons_learned, {}, limit, after, response)
+        return [LessonsLearned(**parse_from_mongo(lesson, LessonsLearned)) for lesson in lessons]
     except Exception as e:
         logger.error(f"Error retrieving lessons learned: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1458,7 +3243,7 @@ async def get_all_lessons_learned():
 async def get_lessons_learned_by_exercise(exercise_id: str):
     try:
         lessons = await db.lessons_learned.find({"exercise_id": exercise_id}).to_list(length=None)
-        return [LessonsLearned(**parse_from_mongo(lesson)) for lesson in lessons]
+        return [LessonsLearned(**parse_from_mongo(lesson, LessonsLearned)) for lesson in lessons]
     except Exception as e:
         logger.error(f"Error retrieving lessons learned for exercise {exercise_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1469,7 +3254,7 @@ async def get_lessons_learned(lesson_id: str):
         lesson = await db.lessons_learned.find_one({"id": lesson_id})
         if not lesson:
             raise HTTPException(status_code=404, detail="Lessons learned not found")
-        return LessonsLearned(**parse_from_mongo(lesson))
+        return LessonsLearned(**parse_from_mongo(lesson, LessonsLearned))
     except HTTPException:
         raise
     except Exception as e:
@@ -1485,10 +3270,10 @@ async def update_lessons_learned(lesson_id: str, lesson_update: LessonsLearnedUp
             raise HTTPException(status_code=404, detail="Lessons learned not found")
         
         # Update fields
-        update_data = lesson_update.dict(exclude_unset=True)
+        update_data = await store_embedded_images(lesson_update.dict(exclude_unset=True))
         update_data["updated_at"] = datetime.now(timezone.utc)
         
-        update_mongo = prepare_for_mongo(update_data)
+        update_mongo = prepare_for_mongo(update_data, LessonsLearned)
         await db.lessons_learned.update_one(
             {"id": lesson_id}, 
             {"$set": update_mongo}
@@ -1496,7 +3281,7 @@ async def update_lessons_learned(lesson_id: str, lesson_update: LessonsLearnedUp
         
         # Get updated lesson
         updated_lesson = await db.lessons_learned.find_one({"id": lesson_id})
-        return LessonsLearned(**parse_from_mongo(updated_lesson))
+        return LessonsLearned(**parse_from_mongo(updated_lesson, LessonsLearned))
     except HTTPException:
         raise
     except Exception as e:
@@ -1516,63 +3301,118 @@ async def delete_lessons_learned(lesson_id: str):
         logger.error(f"Error deleting lessons learned {lesson_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Weather location index
+class WeatherLocationIndex:
+    """In-process province -> sorted cities -> feed URL lookup for the weather picker
+
+    Rebuilt at startup and after every weather_locations write in this process;
+    the TTL lets other worker processes pick up writes they did not see.
+    """
+
+    ttl_seconds = 300
+
+    def __init__(self):
+        self.feeds = {}
+        self.provinces = []
+        self.cities = {}
+        self.loaded_at = None
+        self.lock = asyncio.Lock()
+
+    def stale(self) -> bool:
+        return self.loaded_at is None or (datetime.now(timezone.utc) - self.loaded_at).total_seconds() > self.ttl_seconds
+
+    async def load(self):
+        feeds = {}
+        projection = {"_id": 0, "state_province": 1, "city": 1, "rss_feed": 1}
+        async for location in db.weather_locations.find({}, projection):
+            province, city = location.get("state_province"), location.get("city")
+            if province and city:
+                feeds.setdefault(province, {})[city] = location.get("rss_feed")
+        # Swap in complete structures so readers never see a partial index
+        self.cities = {province: sorted(cities) for province, cities in feeds.items()}
+        self.provinces = sorted(feeds)
+        self.feeds = feeds
+        self.loaded_at = datetime.now(timezone.utc)
+
+    async def rebuild(self):
+        async with self.lock:
+            await self.load()
+
+    async def ensure_fresh(self):
+        if not self.stale():
+            return
+        async with self.lock:
+            # Requests that queued behind a rebuild find the index fresh again
+            if self.stale():
+                await self.load()
+
+weather_index = WeatherLocationIndex()
+
 # Weather Data API Endpoints
 @api_router.get("/weather-locations", response_model=List[WeatherLocation])
-async def get_weather_locations():
-    locations = await db.weather_locations.find().to_list(1000)
+async def get_weather_locations(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+):
+    locations = await fetch_page(db.weather_locations, {}, limit, after, response)
     return [WeatherLocation(**location) for location in locations]
 
 @api_router.get("/weather-locations/provinces", response_model=List[str])
 async def get_provinces():
     """Get unique list of provinces/states"""
-    pipeline = [
-        {"$group": {"_id": "$state_province"}},
-        {"$sort": {"_id": 1}}
-    ]
-    provinces = await db.weather_locations.aggregate(pipeline).to_list(1000)
-    return [province["_id"] for province in provinces if province["_id"]]
+    await weather_index.ensure_fresh()
+    return weather_index.provinces
 
 @api_router.get("/weather-locations/cities/{province}", response_model=List[str])
 async def get_cities_by_province(province: str):
     """Get cities for a specific province/state"""
-    pipeline = [
-        {"$match": {"state_province": province}},
-        {"$group": {"_id": "$city"}},
-        {"$sort": {"_id": 1}}
-    ]
-    cities = await db.weather_locations.aggregate(pipeline).to_list(1000)
-    return [city["_id"] for city in cities if city["_id"]]
+    await weather_index.ensure_fresh()
+    return weather_index.cities.get(province, [])
 
 @api_router.get("/weather-locations/rss/{province}/{city}")
 async def get_weather_rss(province: str, city: str):
     """Get RSS feed URL for a specific city and province"""
-    location = await db.weather_locations.find_one({
-        "state_province": province,
-        "city": city
-    })
-    if not location:
+    await weather_index.ensure_fresh()
+    cities = weather_index.feeds.get(province, {})
+    if city not in cities:
         raise HTTPException(status_code=404, detail="Weather location not found")
-    return {"rss_feed": location["rss_feed"], "city": city, "province": province}
+    return {
+        "rss_feed": cities[city],
+        "proxy_url": f"/api/weather-locations/feed/{quote(province, safe='')}/{quote(city, safe='')}",
+        "city": city,
+        "province": province,
+    }
+
+WEATHER_LOCATION_EXISTS = "A weather location for this city and province already exists"
 
 @api_router.post("/weather-locations", response_model=WeatherLocation)
 async def create_weather_location(location_data: WeatherLocationCreate):
     location = WeatherLocation(**location_data.dict())
-    location_mongo = prepare_for_mongo(location.dict())
-    await db.weather_locations.insert_one(location_mongo)
+    location_mongo = prepare_for_mongo(location.dict(), WeatherLocation)
+    try:
+        await db.weather_locations.insert_one(location_mongo)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=WEATHER_LOCATION_EXISTS)
+    await weather_index.rebuild()
     return location
 
 @api_router.put("/weather-locations/{location_id}", response_model=WeatherLocation)
 async def update_weather_location(location_id: str, location_data: WeatherLocationUpdate):
     update_dict = location_data.dict(exclude_unset=True)
     update_dict["updated_at"] = datetime.now(timezone.utc)
-    update_mongo = prepare_for_mongo(update_dict)
+    update_mongo = prepare_for_mongo(update_dict, WeatherLocation)
     
-    result = await db.weather_locations.update_one(
-        {"id": location_id},
-        {"$set": update_mongo}
-    )
+    try:
+        result = await db.weather_locations.update_one(
+            {"id": location_id},
+            {"$set": update_mongo}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=WEATHER_LOCATION_EXISTS)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Weather location not found")
+    await weather_index.rebuild()
     
     location = await db.weather_locations.find_one({"id": location_id})
     return WeatherLocation(**location)
@@ -1582,11 +3422,248 @@ async def delete_weather_location(location_id: str):
     result = await db.weather_locations.delete_one({"id": location_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Weather location not found")
+    await weather_index.rebuild()
     return {"message": "Weather location deleted successfully"}
 
+# Weather feed proxy
+class WeatherFeedProxy:
+    """Caching proxy for weather feeds and satellite images
+
+    Responses are kept on disk with their ETag/Last-Modified validators. Fresh
+    entries are served directly, stale ones are served immediately while a single
+    background conditional request revalidates them, and upstream concurrency is
+    bounded by a semaphore shared with the pooled HTTP client. Redirects are
+    followed by hand so every hop is held to the host allowlist.
+    """
+
+    max_redirects = 5
+
+    def __init__(self, cache_dir: Path, ttl_seconds: int, max_stale_seconds: int,
+                 max_concurrency: int, allowed_hosts: List[str], timeout: float = 15.0):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_concurrency = max_concurrency
+        self.allowed_hosts = {host.strip().lower() for host in allowed_hosts if host.strip()}
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.refreshing = {}
+        self.client = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=False,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            )
+        return self.client
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def host_allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return parts.scheme in ("http", "https") and (parts.hostname or "").lower() in self.allowed_hosts
+
+    def check_url(self, url: str):
+        if not self.host_allowed(url):
+            raise HTTPException(status_code=400, detail="Feed host is not allowed for proxying")
+
+    def entry_paths(self, url: str) -> tuple:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def read_entry(self, url: str) -> Optional[dict]:
+        body_path, meta_path = self.entry_paths(url)
+        if not (body_path.exists() and meta_path.exists()):
+            return None
+        try:
+            return json.loads(meta_path.read_text())
+        except ValueError:
+            return None
+
+    def write_entry(self, url: str, meta: dict, content: Optional[bytes]):
+        """Write body then metadata atomically; a 304 only rewrites the metadata"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        body_path, meta_path = self.entry_paths(url)
+        suffix = uuid.uuid4().hex
+        if content is not None:
+            temp_body = body_path.with_name(f"{body_path.name}.{suffix}.tmp")
+            temp_body.write_bytes(content)
+            os.replace(temp_body, body_path)
+        temp_meta = meta_path.with_name(f"{meta_path.name}.{suffix}.tmp")
+        temp_meta.write_text(json.dumps(meta))
+        os.replace(temp_meta, meta_path)
+
+    def age(self, meta: dict) -> float:
+        return datetime.now(timezone.utc).timestamp() - meta["fetched_at"]
+
+    async def fetch(self, url: str, meta: Optional[dict]) -> dict:
+        """Fetch from upstream, conditionally when validators are cached"""
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        async with self.semaphore:
+            target = url
+            for _ in range(self.max_redirects + 1):
+                upstream = await self.get_client().get(target, headers=headers)
+                if not upstream.has_redirect_location:
+                    break
+                target = str(upstream.url.join(upstream.headers["location"]))
+                if not self.host_allowed(target):
+                    raise httpx.HTTPError(f"Redirect from {url} to a host that is not allowed: {target}")
+            else:
+                raise httpx.TooManyRedirects(f"Too many redirects from {url}", request=upstream.request)
+
+        now = datetime.now(timezone.utc).timestamp()
+        if upstream.status_code == 304 and meta:
+            meta = {**meta, "fetched_at": now}
+            await asyncio.to_thread(self.write_entry, url, meta, None)
+            return meta
+        upstream.raise_for_status()
+        meta = {
+            "url": url,
+            "etag": upstream.headers.get("etag"),
+            "last_modified": upstream.headers.get("last-modified"),
+            "content_type": upstream.headers.get("content-type", "application/octet-stream"),
+            "fetched_at": now,
+        }
+        await asyncio.to_thread(self.write_entry, url, meta, upstream.content)
+        return meta
+
+    async def revalidate(self, url: str, meta: dict):
+        try:
+            await self.fetch(url, meta)
+        except httpx.HTTPError as e:
+            logger.warning(f"Background revalidation failed for {url}: {e}")
+        finally:
+            self.refreshing.pop(url, None)
+
+    async def get(self, url: str) -> tuple:
+        """Return (metadata, body path, cache status) for a feed URL"""
+        self.check_url(url)
+        meta = await asyncio.to_thread(self.read_entry, url)
+        if meta is not None:
+            age = self.age(meta)
+            if age <= self.ttl_seconds:
+                return meta, self.entry_paths(url)[0], "HIT"
+            if age <= self.ttl_seconds + self.max_stale_seconds:
+                if url not in self.refreshing:
+                    self.refreshing[url] = asyncio.create_task(self.revalidate(url, meta))
+                return meta, self.entry_paths(url)[0], "STALE"
+        try:
+            meta = await self.fetch(url, meta)
+            return meta, self.entry_paths(url)[0], "MISS"
+        except httpx.HTTPError as e:
+            if meta is not None:
+                logger.warning(f"Serving expired cache for {url} after upstream error: {e}")
+                return meta, self.entry_paths(url)[0], "STALE"
+            raise HTTPException(status_code=502, detail="Weather feed upstream unavailable")
+
+weather_proxy = WeatherFeedProxy(
+    cache_dir=Path(os.environ.get("WEATHER_CACHE_DIR", str(ROOT_DIR / "weather_cache"))),
+    ttl_seconds=int(os.environ.get("WEATHER_CACHE_TTL_SECONDS", "300")),
+    max_stale_seconds=int(os.environ.get("WEATHER_CACHE_MAX_STALE_SECONDS", "86400")),
+    max_concurrency=int(os.environ.get("WEATHER_PROXY_MAX_CONCURRENCY", "4")),
+    allowed_hosts=os.environ.get("WEATHER_PROXY_ALLOWED_HOSTS", "weather.gc.ca,dd.weather.gc.ca").split(","),
+)
+
+@api_router.get("/weather-locations/feed/{province}/{city}")
+async def get_weather_feed(province: str, city: str):
+    """Proxy the feed or image for a city through the shared weather cache"""
+    await weather_index.ensure_fresh()
+    feed_url = weather_index.feeds.get(province, {}).get(city)
+    if not feed_url:
+        raise HTTPException(status_code=404, detail="Weather location not found")
+    meta, body_path, cache_status = await weather_proxy.get(feed_url)
+    return FileResponse(
+        body_path,
+        media_type=meta["content_type"],
+        headers={"X-Cache": cache_status, "Cache-Control": f"public, max-age={weather_proxy.ttl_seconds}"}
+    )
+
+# Weather import
+WEATHER_IMPORT_CHUNK_ROWS = 500
+WEATHER_COLUMN_ALIASES = {
+    "city": "city",
+    "state_province": "state_province",
+    "province": "state_province",
+    "state": "state_province",
+    "province_state": "state_province",
+    "state/province": "state_province",
+    "province/state": "state_province",
+    "rss_feed": "rss_feed",
+    "rss": "rss_feed",
+    "feed": "rss_feed",
+    "rss_feed_url": "rss_feed",
+}
+
+def normalize_weather_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Map spreadsheet headers onto city/state_province/rss_feed and trim values"""
+    columns = {}
+    for column in frame.columns:
+        key = str(column).strip().lower().replace(" ", "_")
+        if key in WEATHER_COLUMN_ALIASES:
+            columns[column] = WEATHER_COLUMN_ALIASES[key]
+    frame = frame.rename(columns=columns)
+    missing = {"city", "state_province", "rss_feed"} - set(frame.columns)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(sorted(missing))}")
+    frame = frame[["city", "state_province", "rss_feed"]].astype("string")
+    return frame.apply(lambda column: column.str.strip())
+
+def iter_spreadsheet_chunks(source, filename: str, chunk_rows: int):
+    """Yield DataFrame chunks from a CSV or XLSX upload without loading the whole sheet"""
+    if filename.lower().endswith(".csv"):
+        # Blank lines are kept so callers can report spreadsheet row numbers
+        yield from pd.read_csv(source, dtype=str, chunksize=chunk_rows, skip_blank_lines=False)
+        return
+    if not filename.lower().endswith((".xlsx", ".xlsm")):
+        raise HTTPException(status_code=400, detail="Import accepts .csv or .xlsx files")
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+def weather_upsert(row) -> UpdateOne:
+    """Upsert keyed on (state_province, city) that only touches updated_at when the feed changes"""
+    now = datetime.now(timezone.utc)
+    # Pipeline updates read strings starting with "$" as field paths
+    rss_feed = {"$literal": row.rss_feed}
+    return UpdateOne(
+        {"state_province": row.state_province, "city": row.city},
+        [{"$set": {
+            "id": {"$ifNull": ["$id", str(uuid.uuid4())]},
+            "rss_feed": rss_feed,
+            "created_at": {"$ifNull": ["$created_at", now]},
+            "updated_at": {"$cond": [{"$eq": ["$rss_feed", rss_feed]}, "$updated_at", now]},
+        }}],
+        upsert=True
+    )
+
 @api_router.post("/weather-locations/import-excel")
-async def import_weather_data():
-    """Import weather data from the Excel file structure"""
+async def import_weather_data(file: Optional[UploadFile] = File(None)):
+    """Upsert weather locations from an uploaded CSV/XLSX, or the built-in Canadian sample set"""
     # Sample Canadian weather data based on the Excel file
     sample_data = [
         {"city": "Athabasca", "state_province": "Alberta", "rss_feed": "https://weather.gc.ca/data/satellite/goes_wcan_visible_100.jpg"},
@@ -1615,18 +3692,173 @@ async def import_weather_data():
         {"city": "Saskatoon", "state_province": "Saskatchewan", "rss_feed": "https://weather.gc.ca/data/satellite/goes_wcan_visible_100.jpg"}
     ]
     
-    # Clear existing data
-    await db.weather_locations.delete_many({})
-    
-    # Insert sample data
-    locations = []
-    for data in sample_data:
-        location = WeatherLocation(**data)
-        location_mongo = prepare_for_mongo(location.dict())
-        await db.weather_locations.insert_one(location_mongo)
-        locations.append(location)
-    
-    return {"message": f"Imported {len(locations)} weather locations successfully"}
+    if file is None:
+        chunks = iter([pd.DataFrame(sample_data)])
+    else:
+        chunks = iter_spreadsheet_chunks(file.file, file.filename or "", WEATHER_IMPORT_CHUNK_ROWS)
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    while True:
+        # Parsing is blocking work, so each chunk is read off the event loop
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        frame = normalize_weather_frame(chunk)
+        complete = frame.dropna()
+        complete = complete[(complete != "").all(axis=1)]
+        counts["skipped"] += len(frame) - len(complete)
+        operations = [weather_upsert(row) for row in complete.itertuples(index=False)]
+        if not operations:
+            continue
+        try:
+            result = (await db.weather_locations.bulk_write(operations, ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            # A concurrent import inserted the same city first
+            result = e.details
+            counts["skipped"] += len(result["writeErrors"])
+        counts["inserted"] += result["nUpserted"]
+        counts["updated"] += result["nModified"]
+        counts["unchanged"] += result["nMatched"] - result["nModified"]
+
+    await weather_index.rebuild()
+    return {
+        "message": f"Imported weather locations: {counts['inserted']} inserted, "
+                   f"{counts['updated']} updated, {counts['unchanged']} unchanged",
+        **counts,
+    }
+
+# Blob Store API endpoints
+@api_router.get("/blobs/{digest}")
+async def get_blob(digest: str, size: Optional[str] = None):
+    """Serve a stored blob, or one of its pre-rendered thumbnails"""
+    if not SHA256_PATTERN.match(digest):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    blob = await db.blobs.find_one({"sha256": digest}, {"_id": 0})
+    if not blob:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    if size and size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unknown thumbnail size: {size}")
+
+    # Fall back to the original when the image could not be thumbnailed
+    target = blob.get("thumbnails", {}).get(size) if size else None
+    target_digest = target["sha256"] if target else digest
+    media_type = target["media_type"] if target else blob["media_type"]
+    path = blob_path(target_digest)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Blob content missing")
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+@api_router.post("/blobs/migrate")
+async def migrate_embedded_images():
+    """One-off migration moving embedded base64 images into the blob store"""
+    report = {}
+    for collection_name in IMAGE_COLLECTIONS:
+        collection = db[collection_name]
+        migrated = 0
+        async for document in collection.find({}, batch_size=100):
+            updates = {}
+            for key, value in document.items():
+                if key != "_id" and has_embedded_images(value):
+                    updates[key] = await store_embedded_images(value)
+            if updates:
+                await collection.update_one({"_id": document["_id"]}, {"$set": updates})
+                migrated += 1
+        report[collection_name] = migrated
+    logger.info(f"Embedded image migration complete: {report}")
+    return {"message": "Embedded images migrated to blob store", "migrated": report}
+
+# Date migration
+@api_router.post("/admin/migrate-dates")
+async def migrate_string_dates():
+    """One-off migration converting datetime fields stored as ISO strings into BSON dates"""
+    collection_models = {
+        "exercise_builder": ExerciseBuilder,
+        "exercise_goals": ExerciseGoal,
+        "exercise_objectives": ExerciseObjective,
+        "exercise_events": ExerciseEvent,
+        "exercise_functions": ExerciseFunction,
+        "exercise_organizations": ExerciseOrganization,
+        "msel_events": MSELEvent,
+        "hira_entries": HIRAEntry,
+        "participants": Participant,
+        "locations": Location,
+        "scribe_templates": ScribeTemplate,
+        "resources": Resource,
+        "evaluation_reports": EvaluationReport,
+        "lessons_learned": LessonsLearned,
+        "weather_locations": WeatherLocation,
+        "scenarios": Scenario,
+        "map_objects": MapObject,
+    }
+    report = {}
+    for collection_name, model in collection_models.items():
+        collection = db[collection_name]
+        fields = mongo_codec(model).datetime_fields
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        operations = []
+        converted = 0
+        async for document in collection.find(query, {field: 1 for field in fields}):
+            updates = {}
+            for field in fields:
+                value = document.get(field)
+                parsed = parse_datetime(value)
+                if isinstance(value, str) and isinstance(parsed, datetime):
+                    updates[field] = parsed
+            if updates:
+                operations.append(UpdateOne({"_id": document["_id"]}, {"$set": updates}))
+            if len(operations) >= 500:
+                converted += (await collection.bulk_write(operations, ordered=False)).modified_count
+                operations = []
+        if operations:
+            converted += (await collection.bulk_write(operations, ordered=False)).modified_count
+        report[collection_name] = converted
+    logger.info(f"String date migration complete: {report}")
+    return {"message": "String dates migrated to BSON dates", "converted": report}
+
+# MSEL sort key backfill
+@api_router.post("/admin/backfill-msel-sort-keys")
+async def backfill_msel_sort_keys():
+    updated = await ensure_sort_keys()
+    return {"message": "MSEL sort keys backfilled", "updated": updated}
+
+# Scenario offset backfill
+@api_router.post("/admin/backfill-scenario-offsets")
+async def backfill_scenario_offsets():
+    updated = await retime_msel_events()
+    return {"message": "Scenario offsets recomputed", "updated": updated}
+
+# Counter backfill
+@api_router.post("/admin/backfill-counters")
+async def backfill_sequence_counters():
+    seeded = await backfill_counters()
+    return {"message": "Counters backfilled", "seeded": seeded}
+
+# Index report
+@api_router.get("/admin/indexes")
+async def get_index_report():
+    """List registered indexes that are missing and existing indexes that have not been used"""
+    report = {}
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        existing_keys = {tuple(tuple(key) for key in info["key"]) for info in existing.values()}
+        missing = [
+            index.document["name"] for index in indexes
+            if tuple(index.document["key"].items()) not in existing_keys
+        ]
+        unused = []
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    unused.append(stats["name"])
+        except OperationFailure as e:
+            logger.warning(f"Index usage statistics unavailable for {collection_name}: {e}")
+        report[collection_name] = {"missing": missing, "unused": sorted(unused)}
+    return report
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -1637,6 +3869,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Cache"],
 )
 
 # Configure logging
@@ -1704,28 +3937,30 @@ class Scenario(BaseModel):
 # Scenario API Endpoints
 @app.post("/api/scenarios", response_model=Scenario)
 async def create_scenario(scenario: Scenario):
-    scenario_dict = scenario.dict()
-    scenario_dict = prepare_for_mongo(scenario_dict)
+    scenario_dict = await store_embedded_images(scenario.dict())
+    scenario = Scenario(**scenario_dict)
+    scenario_dict = prepare_for_mongo(scenario_dict, Scenario)
     await db.scenarios.insert_one(scenario_dict)
     return scenario
 
 @app.get("/api/scenarios", response_model=List[Scenario])
 async def get_scenarios(exercise_id: str):
     scenarios = await db.scenarios.find({"exercise_id": exercise_id}).to_list(length=None)
-    return [Scenario(**parse_from_mongo(scenario)) for scenario in scenarios]
+    return [Scenario(**parse_from_mongo(scenario, Scenario)) for scenario in scenarios]
 
 @app.get("/api/scenarios/{scenario_id}", response_model=Scenario)
 async def get_scenario(scenario_id: str):
     scenario = await db.scenarios.find_one({"id": scenario_id})
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
-    return Scenario(**parse_from_mongo(scenario))
+    return Scenario(**parse_from_mongo(scenario, Scenario))
 
 @app.put("/api/scenarios/{scenario_id}", response_model=Scenario)
 async def update_scenario(scenario_id: str, scenario: Scenario):
-    scenario_dict = scenario.dict()
+    scenario_dict = await store_embedded_images(scenario.dict())
+    scenario = Scenario(**scenario_dict)
     scenario_dict["updated_at"] = datetime.now(timezone.utc)
-    scenario_dict = prepare_for_mongo(scenario_dict)
+    scenario_dict = prepare_for_mongo(scenario_dict, Scenario)
     
     await db.scenarios.update_one(
         {"id": scenario_id}, 
@@ -1740,28 +3975,709 @@ async def delete_scenario(scenario_id: str):
         raise HTTPException(status_code=404, detail="Scenario not found")
     return {"message": "Scenario deleted successfully"}
 
+# File Upload settings
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Accepted upload types, identified by their leading bytes rather than the client's filename
+UPLOAD_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (b"GIF87a", "image/gif", "gif"),
+    (b"GIF89a", "image/gif", "gif"),
+    (b"II*\x00", "image/tiff", "tiff"),
+    (b"MM\x00*", "image/tiff", "tiff"),
+    (b"%PDF-", "application/pdf", "pdf"),
+]
+
+def sniff_upload_type(head: bytes) -> Optional[tuple]:
+    """Return (media_type, extension) for a supported file header"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+    for signature, media_type, extension in UPLOAD_SIGNATURES:
+        if head.startswith(signature):
+            return media_type, extension
+    return None
+
+def remove_file(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+# Content-addressed names for uploads
+# Each upload is hard-linked as /uploads/c/<sha256>.<ext> so clients get a URL that
+# changes whenever the bytes do; compressible types also get a .gz sibling that
+# UploadStaticFiles serves to clients sending Accept-Encoding: gzip.
+PRECOMPRESS_MEDIA_TYPES = {"image/tiff", "application/pdf"}
+PRECOMPRESS_MIN_SAVING = 0.1
+
+def link_content_file(filename: str, sha256: str) -> str:
+    """Create the content-addressed alias of an upload and return its URL"""
+    content_name = f"{sha256}.{filename.rsplit('.', 1)[-1]}"
+    target = content_dir / content_name
+    if not target.exists():
+        try:
+            os.link(uploads_dir / filename, target)
+        except FileExistsError:
+            pass
+        except OSError:
+            temp_path = content_dir / f".{uuid.uuid4()}.part"
+            shutil.copyfile(uploads_dir / filename, temp_path)
+            os.replace(temp_path, target)
+    return f"/uploads/c/{content_name}"
+
+async def upload_content_url(record: dict) -> str:
+    return await asyncio.to_thread(link_content_file, record["filename"], record["sha256"])
+
+def precompress_upload(filename: str, sha256: str):
+    """Write a gzip variant next to both names of an upload when it is worth serving"""
+    source = uploads_dir / filename
+    content_variant = content_dir / f"{sha256}.{filename.rsplit('.', 1)[-1]}.gz"
+    if not content_variant.exists():
+        temp_path = content_dir / f".{uuid.uuid4()}.part"
+        with open(source, "rb") as raw, gzip.open(temp_path, "wb", compresslevel=9) as compressed:
+            shutil.copyfileobj(raw, compressed, UPLOAD_CHUNK_SIZE)
+        if temp_path.stat().st_size > source.stat().st_size * (1 - PRECOMPRESS_MIN_SAVING):
+            remove_file(temp_path)
+            return
+        os.replace(temp_path, content_variant)
+    try:
+        os.link(content_variant, uploads_dir / f"{filename}.gz")
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copyfile(content_variant, uploads_dir / f"{filename}.gz")
+
+# Image derivatives
+# Uploaded images are re-encoded at fixed widths in a process pool so decoding
+# large TIFF/JPEG sources never blocks the event loop; results are cached on
+# disk keyed by the source's SHA-256 and the requested size.
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+DERIVATIVE_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+DERIVATIVE_SOURCE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/tiff", "image/webp"}
+derivatives_dir = uploads_dir / "derivatives"
+derivatives_dir.mkdir(exist_ok=True)
+derivative_executor = None
+derivative_jobs = {}
+
+def get_derivative_executor() -> ProcessPoolExecutor:
+    global derivative_executor
+    if derivative_executor is None:
+        derivative_executor = ProcessPoolExecutor(max_workers=int(os.environ.get("DERIVATIVE_WORKERS", "2")))
+    return derivative_executor
+
+def render_derivative(source_path: str, target_path: str, width: int, image_format: str):
+    """Resize the first frame of an image to a fixed width; runs in a worker process"""
+    with Image.open(source_path) as source:
+        source.seek(0)
+        image = source.copy()
+    if image.width > width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+    if image_format == "JPEG":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.mode or "transparency" in image.info else "RGB")
+    temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+    image.save(temp_path, image_format, quality=82)
+    os.replace(temp_path, target_path)
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def upload_source_hash(filename: str) -> str:
+    """SHA-256 of an uploaded file, recorded on first use for uploads that predate hashing"""
+    record = await db.uploads.find_one({"filename": filename}, {"_id": 0, "sha256": 1})
+    if record:
+        return record["sha256"]
+    path = uploads_dir / filename
+    sha256 = await asyncio.to_thread(hash_file, path)
+    size = await asyncio.to_thread(lambda: path.stat().st_size)
+    try:
+        await db.uploads.update_one(
+            {"filename": filename},
+            {
+                "$set": {"sha256": sha256, "size": size},
+                "$setOnInsert": {"file_path": f"/uploads/{filename}", "created_at": datetime.now(timezone.utc)}
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The same content is already recorded under another filename
+        pass
+    return sha256
+
+async def ensure_derivative(filename: str, width: int, format_name: str) -> Path:
+    """Render a derivative once, sharing the job between concurrent requests"""
+    image_format, _ = DERIVATIVE_FORMATS[format_name]
+    source_hash = await upload_source_hash(filename)
+    target = derivatives_dir / f"{source_hash}_{width}.{format_name}"
+    if target.exists():
+        return target
+    key = str(target)
+    if key not in derivative_jobs:
+        loop = asyncio.get_running_loop()
+        derivative_jobs[key] = loop.run_in_executor(
+            get_derivative_executor(), render_derivative, str(uploads_dir / filename), key, width, image_format
+        )
+    try:
+        await derivative_jobs[key]
+    finally:
+        derivative_jobs.pop(key, None)
+    return target
+
+async def pregenerate_derivatives(filename: str):
+    for width in DERIVATIVE_WIDTHS:
+        try:
+            await ensure_derivative(filename, width, "webp")
+        except Exception as e:
+            logger.warning(f"Could not pre-generate {width}px derivative of {filename}: {e}")
+            return
+
+@app.get("/api/uploads/{filename}/derivative")
+async def get_upload_derivative(filename: str, width: int = 640, format: str = "webp"):
+    """Serve a resized WebP/JPEG rendition of an uploaded image"""
+    if width not in DERIVATIVE_WIDTHS:
+        raise HTTPException(status_code=400, detail=f"width must be one of {list(DERIVATIVE_WIDTHS)}")
+    if format not in DERIVATIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(DERIVATIVE_FORMATS)}")
+    if "/" in filename or filename.startswith(".") or not (uploads_dir / filename).is_file():
+        raise HTTPException(status_code=404, detail="Upload not found")
+    try:
+        path = await ensure_derivative(filename, width, format)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not render derivative of {filename}: {e}")
+        raise HTTPException(status_code=415, detail="Upload is not a decodable image")
+    return FileResponse(
+        path,
+        media_type=DERIVATIVE_FORMATS[format][1],
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
 # File Upload Endpoint
 @app.post("/api/upload")
-async def upload_file(file: UploadFile = File(...)):
-    import os
-    import shutil
-    from pathlib import Path
-    
-    # Create uploads directory if it doesn't exist
-    upload_dir = Path("/app/uploads")
-    upload_dir.mkdir(exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1]
-    unique_filename = f"{str(uuid.uuid4())}.{file_extension}"
-    file_path = upload_dir / unique_filename
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Return the file path (relative to serve via static files)
-    return {"file_path": f"/uploads/{unique_filename}"}
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """Stream an upload to disk off the event loop, hashing it and deduplicating by content"""
+    temp_path = uploads_dir / f".{uuid.uuid4()}.part"
+    digest = hashlib.sha256()
+    size = 0
+    sniffed = None
+    handle = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            if sniffed is None:
+                sniffed = sniff_upload_type(chunk)
+                if sniffed is None:
+                    raise HTTPException(status_code=415, detail="Unsupported file type")
+            size += len(chunk)
+            if size > UPLOAD_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"File exceeds the {UPLOAD_MAX_BYTES} byte upload limit")
+            digest.update(chunk)
+            await asyncio.to_thread(handle.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(handle.close)
+        await asyncio.to_thread(remove_file, temp_path)
+        raise
+    await asyncio.to_thread(handle.close)
+
+    if sniffed is None:
+        await asyncio.to_thread(remove_file, temp_path)
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+    sha256 = digest.hexdigest()
+    existing = await db.uploads.find_one({"sha256": sha256}, {"_id": 0})
+    if existing and (uploads_dir / existing["filename"]).exists():
+        await asyncio.to_thread(remove_file, temp_path)
+        return {
+            "file_path": existing["file_path"],
+            "content_url": await upload_content_url(existing),
+            "sha256": sha256,
+            "size": existing["size"],
+            "deduplicated": True
+        }
+
+    media_type, extension = sniffed
+    unique_filename = f"{uuid.uuid4()}.{extension}"
+    await asyncio.to_thread(os.replace, temp_path, uploads_dir / unique_filename)
+    record = {
+        "sha256": sha256,
+        "filename": unique_filename,
+        "file_path": f"/uploads/{unique_filename}",
+        "content_url": await asyncio.to_thread(link_content_file, unique_filename, sha256),
+        "media_type": media_type,
+        "size": size,
+        "original_filename": file.filename,
+        "created_at": datetime.now(timezone.utc),
+    }
+    try:
+        await db.uploads.update_one({"sha256": sha256}, {"$set": record}, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent upload of the same content won the race; keep its file
+        await asyncio.to_thread(remove_file, uploads_dir / unique_filename)
+        existing = await db.uploads.find_one({"sha256": sha256}, {"_id": 0})
+        return {
+            "file_path": existing["file_path"],
+            "content_url": await upload_content_url(existing),
+            "sha256": sha256,
+            "size": existing["size"],
+            "deduplicated": True
+        }
+
+    if media_type in DERIVATIVE_SOURCE_TYPES:
+        background_tasks.add_task(pregenerate_derivatives, unique_filename)
+    if media_type in PRECOMPRESS_MEDIA_TYPES:
+        background_tasks.add_task(asyncio.to_thread, precompress_upload, unique_filename, sha256)
+
+    # Return the file path (relative to serve via static files) and its cache-forever alias
+    return {
+        "file_path": record["file_path"],
+        "content_url": record["content_url"],
+        "sha256": sha256,
+        "size": size,
+        "deduplicated": False
+    }
+
+@app.get("/api/upload/by-hash/{sha256}")
+async def get_upload_by_hash(sha256: str):
+    """Let clients skip re-uploading content the server already has"""
+    existing = await db.uploads.find_one({"sha256": sha256.lower()}, {"_id": 0})
+    if not existing or not (uploads_dir / existing["filename"]).exists():
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {
+        "file_path": existing["file_path"],
+        "content_url": await upload_content_url(existing),
+        "sha256": existing["sha256"],
+        "size": existing["size"]
+    }
+
+# Map geometry
+# Geometries are stored as GeoJSON in [longitude, latitude] order under a
+# 2dsphere index so map views can ask for just the features in their viewport.
+GEOJSON_RING_MINIMUM = 4
+BBOX_EDGE_STEP_DEGREES = 1.0
+
+def normalize_position(position) -> list:
+    if not isinstance(position, (list, tuple)) or len(position) < 2:
+        raise ValueError("Positions must be [longitude, latitude] pairs")
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in position[:2]):
+        raise ValueError("Position coordinates must be numbers")
+    longitude, latitude = float(position[0]), float(position[1])
+    if not -180 <= longitude <= 180 or not -90 <= latitude <= 90:
+        raise ValueError(f"Position {[longitude, latitude]} is outside longitude/latitude bounds")
+    return [longitude, latitude]
+
+def normalize_path(positions, minimum: int) -> list:
+    """Drop repeated consecutive vertices, which 2dsphere rejects"""
+    if not isinstance(positions, (list, tuple)):
+        raise ValueError("Expected a list of positions")
+    path = []
+    for position in positions:
+        position = normalize_position(position)
+        if not path or path[-1] != position:
+            path.append(position)
+    if minimum == GEOJSON_RING_MINIMUM and path and path[0] != path[-1]:
+        path.append(list(path[0]))
+    if len(path) < minimum:
+        raise ValueError(f"Expected at least {minimum} distinct positions")
+    return path
+
+def normalize_polygon(rings) -> list:
+    if not isinstance(rings, (list, tuple)) or not rings:
+        raise ValueError("Polygons need at least one linear ring")
+    return [normalize_path(ring, GEOJSON_RING_MINIMUM) for ring in rings]
+
+GEOMETRY_NORMALIZERS = {
+    "Point": normalize_position,
+    "MultiPoint": lambda points: [normalize_position(point) for point in points],
+    "LineString": lambda line: normalize_path(line, 2),
+    "MultiLineString": lambda lines: [normalize_path(line, 2) for line in lines],
+    "Polygon": normalize_polygon,
+    "MultiPolygon": lambda polygons: [normalize_polygon(polygon) for polygon in polygons],
+}
+
+def normalize_geometry(geometry: dict) -> dict:
+    """Return a clean GeoJSON geometry or raise ValueError; accepts Features from leaflet's toGeoJSON"""
+    if isinstance(geometry, dict) and geometry.get("type") == "Feature":
+        geometry = geometry.get("geometry")
+    if not isinstance(geometry, dict) or geometry.get("type") not in GEOMETRY_NORMALIZERS:
+        raise ValueError(f"Geometry type must be one of {list(GEOMETRY_NORMALIZERS)}")
+    try:
+        coordinates = GEOMETRY_NORMALIZERS[geometry["type"]](geometry.get("coordinates"))
+    except TypeError:
+        raise ValueError("Malformed geometry coordinates")
+    return {"type": geometry["type"], "coordinates": coordinates}
+
+def validated_geometry(geometry: dict) -> dict:
+    try:
+        return normalize_geometry(geometry)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid geometry: {e}")
+
+def parse_bbox(bbox: str) -> Optional[dict]:
+    """Build a $geoIntersects filter from "west,south,east,north"; None when the box spans the world"""
+    try:
+        west, south, east, north = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be west,south,east,north")
+    south, north = max(south, -90.0), min(north, 90.0)
+    if south >= north or west >= east:
+        raise HTTPException(status_code=400, detail="bbox must have west < east and south < north")
+    return bbox_filter(west, south, east, north)
+
+def bbox_filter(west: float, south: float, east: float, north: float) -> Optional[dict]:
+    if east - west >= 180:
+        # A polygon this wide is ambiguous on the sphere; the whole map is in view anyway
+        return None
+    west, east = max(west, -180.0), min(east, 180.0)
+    # 2dsphere edges are great circles, which bow poleward of a parallel; extra
+    # vertices keep the south and north edges within metres of the box
+    steps = max(1, math.ceil((east - west) / BBOX_EDGE_STEP_DEGREES))
+    longitudes = [west + (east - west) * i / steps for i in range(steps + 1)]
+    ring = ([[lng, south] for lng in longitudes] + [[lng, north] for lng in reversed(longitudes)]
+            + [[west, south]])
+    return {"$geoIntersects": {"$geometry": {"type": "Polygon", "coordinates": [ring]}}}
+
+def parse_near(near: str, max_distance: Optional[float]) -> dict:
+    """Build a $nearSphere filter from "lng,lat", nearest features first"""
+    try:
+        point = normalize_position([float(value) for value in near.split(",")])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="near must be lng,lat")
+    clause = {"$geometry": {"type": "Point", "coordinates": point}}
+    if max_distance is not None:
+        clause["$maxDistance"] = max_distance
+    return {"$nearSphere": clause}
+
+# Zoom-aware simplification
+# Lines and polygons are simplified with Douglas-Peucker once per zoom bucket when
+# they are written and stored under simplified_geometry.<zoom>; a bucket is only
+# stored when it actually drops vertices. Views zoomed in past the last bucket get
+# the full geometry.
+SIMPLIFY_ZOOMS = (4, 6, 8, 10, 12, 14)
+SIMPLIFY_PIXEL_TOLERANCE = 1.0
+
+def zoom_tolerance(zoom: int) -> float:
+    """Degrees covered by SIMPLIFY_PIXEL_TOLERANCE screen pixels at a web-mercator zoom level"""
+    return SIMPLIFY_PIXEL_TOLERANCE * 360.0 / (256 * 2 ** zoom)
+
+def simplify_zoom_bucket(zoom: int) -> Optional[int]:
+    """Finest-needed bucket for a zoom level, or None when the full geometry is required"""
+    return next((bucket for bucket in SIMPLIFY_ZOOMS if bucket >= zoom), None)
+
+def douglas_peucker(path: list, tolerance: float) -> list:
+    points = np.asarray(path, dtype=float)
+    if len(points) < 3:
+        return path
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    tolerance_squared = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        origin = points[start]
+        segment = points[end] - origin
+        offsets = points[start + 1:end] - origin
+        length_squared = segment @ segment
+        if length_squared == 0:
+            distances = (offsets ** 2).sum(axis=1)
+        else:
+            t = np.clip(offsets @ segment / length_squared, 0.0, 1.0)
+            distances = ((offsets - np.outer(t, segment)) ** 2).sum(axis=1)
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance_squared:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return [path[i] for i in np.flatnonzero(keep)]
+
+def simplify_ring(ring: list, tolerance: float) -> list:
+    simplified = douglas_peucker(ring, tolerance)
+    # Keep small rings closed and non-degenerate rather than collapsing them
+    return simplified if len(simplified) >= GEOJSON_RING_MINIMUM else ring
+
+GEOMETRY_SIMPLIFIERS = {
+    "LineString": lambda line, tolerance: douglas_peucker(line, tolerance),
+    "MultiLineString": lambda lines, tolerance: [douglas_peucker(line, tolerance) for line in lines],
+    "Polygon": lambda rings, tolerance: [simplify_ring(ring, tolerance) for ring in rings],
+    "MultiPolygon": lambda polygons, tolerance: [
+        [simplify_ring(ring, tolerance) for ring in rings] for rings in polygons
+    ],
+}
+
+def simplify_geometry(geometry: dict, zoom: int) -> dict:
+    simplifier = GEOMETRY_SIMPLIFIERS.get(geometry.get("type"))
+    if not simplifier:
+        return geometry
+    return {"type": geometry["type"], "coordinates": simplifier(geometry["coordinates"], zoom_tolerance(zoom))}
+
+def simplified_versions(geometry: dict) -> dict:
+    """Precomputed simplifications keyed by zoom bucket, skipping buckets identical to a finer one"""
+    versions = {}
+    finer = geometry
+    for zoom in reversed(SIMPLIFY_ZOOMS):
+        simplified = simplify_geometry(finer, zoom)
+        if simplified["coordinates"] != finer["coordinates"]:
+            versions[str(zoom)] = simplified
+            finer = simplified
+    return versions
+
+def geometry_for_zoom(document: dict, zoom: int) -> dict:
+    """Pick the stored simplification for a zoom level, falling back to a finer one"""
+    bucket = simplify_zoom_bucket(zoom)
+    if bucket is None or not document.get("geometry"):
+        return document.get("geometry")
+    versions = document.get("simplified_geometry")
+    if versions is None:
+        # Written before simplification was precomputed
+        try:
+            return simplify_geometry(document["geometry"], bucket)
+        except (TypeError, ValueError):
+            return document["geometry"]
+    for finer in SIMPLIFY_ZOOMS[SIMPLIFY_ZOOMS.index(bucket):]:
+        if str(finer) in versions:
+            return versions[str(finer)]
+    return document["geometry"]
+
+def zoom_projection(zoom: Optional[int]) -> dict:
+    """Only load the simplification a zoomed view will use"""
+    bucket = simplify_zoom_bucket(zoom) if zoom is not None else None
+    if bucket is None:
+        return {"simplified_geometry": 0}
+    return {f"simplified_geometry.{finer}": 0 for finer in SIMPLIFY_ZOOMS if finer < bucket}
+
+# Map tiles
+# GeoJSON tiles in the XYZ scheme Leaflet uses: features are clipped to the tile
+# plus a small buffer and their coordinates snapped to a TILE_EXTENT grid, so a
+# tile carries no more precision than it can display. Rendered tiles are cached
+# in process and dropped when a write touches their area; writes made through
+# another worker or straight to the database are only seen once the TTL expires.
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = 22
+TILE_CACHE_MAX_TILES = int(os.environ.get("MAP_TILE_CACHE_MAX_TILES", "5000"))
+TILE_CACHE_TTL_SECONDS = int(os.environ.get("MAP_TILE_CACHE_TTL_SECONDS", "30"))
+TILE_MEDIA_TYPE = "application/geo+json"
+map_tile_cache = OrderedDict()
+map_tile_generation = {}
+
+def mercator_y(latitude: float) -> float:
+    latitude = max(min(latitude, 85.0511287798), -85.0511287798)
+    return math.log(math.tan(math.pi / 4 + math.radians(latitude) / 2))
+
+def tile_bounds(z: int, x: int, y: int, buffer: int = 0) -> tuple:
+    """(west, south, east, north) of a tile, optionally grown by buffer extent units"""
+    n = 2 ** z
+    pad = buffer / TILE_EXTENT
+    west = (x - pad) / n * 360 - 180
+    east = (x + 1 + pad) / n * 360 - 180
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y - pad) / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1 + pad) / n))))
+    return west, south, east, north
+
+def geometry_bounds(geometry: Optional[dict]) -> Optional[tuple]:
+    positions = []
+    stack = [geometry.get("coordinates")] if isinstance(geometry, dict) else []
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list) and value and isinstance(value[0], (int, float)):
+            positions.append(value)
+        elif isinstance(value, list):
+            stack.extend(value)
+    if not positions:
+        return None
+    longitudes = [position[0] for position in positions]
+    latitudes = [position[1] for position in positions]
+    return min(longitudes), min(latitudes), max(longitudes), max(latitudes)
+
+def bounds_intersect(a: tuple, b: tuple) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def clip_segment(start: list, end: list, bounds: tuple) -> Optional[tuple]:
+    """Liang-Barsky clipping of one segment to a rectangle"""
+    west, south, east, north = bounds
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, start[0] - west), (dx, east - start[0]), (-dy, start[1] - south), (dy, north - start[1])):
+        if p == 0:
+            if q < 0:
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return None
+    return [start[0] + t0 * dx, start[1] + t0 * dy], [start[0] + t1 * dx, start[1] + t1 * dy]
+
+def clip_line(line: list, bounds: tuple) -> list:
+    """Clip a line to a rectangle, returning the pieces that remain inside"""
+    pieces = []
+    current = []
+    for start, end in zip(line, line[1:]):
+        clipped = clip_segment(start, end, bounds)
+        if clipped is None:
+            if len(current) > 1:
+                pieces.append(current)
+            current = []
+            continue
+        clipped_start, clipped_end = clipped
+        if current and current[-1] != clipped_start:
+            pieces.append(current)
+            current = []
+        if not current:
+            current = [clipped_start]
+        current.append(clipped_end)
+        if clipped_end != end:
+            pieces.append(current)
+            current = []
+    if len(current) > 1:
+        pieces.append(current)
+    return pieces
+
+def clip_ring(ring: list, bounds: tuple) -> list:
+    """Sutherland-Hodgman clipping of a closed ring to a rectangle"""
+    west, south, east, north = bounds
+    edges = [
+        (lambda p: p[0] >= west, lambda a, b: [west, a[1] + (b[1] - a[1]) * (west - a[0]) / (b[0] - a[0])]),
+        (lambda p: p[0] <= east, lambda a, b: [east, a[1] + (b[1] - a[1]) * (east - a[0]) / (b[0] - a[0])]),
+        (lambda p: p[1] >= south, lambda a, b: [a[0] + (b[0] - a[0]) * (south - a[1]) / (b[1] - a[1]), south]),
+        (lambda p: p[1] <= north, lambda a, b: [a[0] + (b[0] - a[0]) * (north - a[1]) / (b[1] - a[1]), north]),
+    ]
+    points = ring[:-1]
+    for inside, intersect in edges:
+        if not points:
+            break
+        clipped = []
+        for index, current in enumerate(points):
+            previous = points[index - 1]
+            if inside(current):
+                if not inside(previous):
+                    clipped.append(intersect(previous, current))
+                clipped.append(current)
+            elif inside(previous):
+                clipped.append(intersect(previous, current))
+        points = clipped
+    return points + points[:1] if len(points) >= 3 else []
+
+def clip_polygon(rings: list, bounds: tuple) -> list:
+    clipped = [clip_ring(ring, bounds) for ring in rings]
+    if not clipped or not clipped[0]:
+        return []
+    return [clipped[0]] + [ring for ring in clipped[1:] if ring]
+
+def clip_geometry(geometry: dict, bounds: tuple) -> Optional[dict]:
+    geometry_type, coordinates = geometry.get("type"), geometry.get("coordinates")
+    inside = lambda p: bounds[0] <= p[0] <= bounds[2] and bounds[1] <= p[1] <= bounds[3]
+    if geometry_type == "Point":
+        return geometry if inside(coordinates) else None
+    if geometry_type == "MultiPoint":
+        points = [point for point in coordinates if inside(point)]
+        return {"type": "MultiPoint", "coordinates": points} if points else None
+    if geometry_type in ("LineString", "MultiLineString"):
+        lines = [coordinates] if geometry_type == "LineString" else coordinates
+        pieces = [piece for line in lines for piece in clip_line(line, bounds)]
+        if not pieces:
+            return None
+        if len(pieces) == 1:
+            return {"type": "LineString", "coordinates": pieces[0]}
+        return {"type": "MultiLineString", "coordinates": pieces}
+    if geometry_type in ("Polygon", "MultiPolygon"):
+        polygons = [coordinates] if geometry_type == "Polygon" else coordinates
+        clipped = [polygon for polygon in (clip_polygon(rings, bounds) for rings in polygons) if polygon]
+        if not clipped:
+            return None
+        if len(clipped) == 1:
+            return {"type": "Polygon", "coordinates": clipped[0]}
+        return {"type": "MultiPolygon", "coordinates": clipped}
+    return None
+
+def quantize_geometry(geometry: dict, z: int, x: int, y: int) -> dict:
+    """Snap positions to the tile's TILE_EXTENT grid and drop vertices that collapse together"""
+    n = 2 ** z
+    scale = n * TILE_EXTENT
+
+    def snap(position):
+        column = round(((position[0] + 180) / 360 * n - x) * TILE_EXTENT)
+        row = round(((1 - mercator_y(position[1]) / math.pi) / 2 * n - y) * TILE_EXTENT)
+        longitude = (x * TILE_EXTENT + column) / scale * 360 - 180
+        latitude = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y * TILE_EXTENT + row) / scale))))
+        return [round(longitude, 7), round(latitude, 7)]
+
+    def snap_path(path):
+        snapped = []
+        for position in path:
+            position = snap(position)
+            if not snapped or snapped[-1] != position:
+                snapped.append(position)
+        return snapped
+
+    geometry_type, coordinates = geometry["type"], geometry["coordinates"]
+    if geometry_type == "Point":
+        return {"type": "Point", "coordinates": snap(coordinates)}
+    if geometry_type == "MultiPoint":
+        return {"type": "MultiPoint", "coordinates": [snap(point) for point in coordinates]}
+    if geometry_type == "LineString":
+        return {"type": "LineString", "coordinates": snap_path(coordinates)}
+    if geometry_type == "MultiLineString":
+        return {"type": "MultiLineString", "coordinates": [snap_path(line) for line in coordinates]}
+    if geometry_type == "Polygon":
+        return {"type": "Polygon", "coordinates": [snap_path(ring) for ring in coordinates]}
+    return {"type": "MultiPolygon", "coordinates": [[snap_path(ring) for ring in rings] for rings in coordinates]}
+
+def render_map_tile(documents: list, z: int, x: int, y: int) -> bytes:
+    bounds = tile_bounds(z, x, y, TILE_BUFFER)
+    features = []
+    for document in documents:
+        geometry = geometry_for_zoom(document, z)
+        if not geometry:
+            continue
+        try:
+            clipped = clip_geometry(geometry, bounds)
+        except (TypeError, IndexError, ZeroDivisionError):
+            continue
+        if not clipped:
+            continue
+        features.append({
+            "type": "Feature",
+            "id": document["id"],
+            "geometry": quantize_geometry(clipped, z, x, y),
+            "properties": {
+                "id": document["id"],
+                "type": document.get("type"),
+                "name": document.get("name"),
+                "description": document.get("description", ""),
+                "color": document.get("color"),
+            },
+        })
+    return json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":")).encode()
+
+def invalidate_map_tiles(exercise_id: str, *geometries: Optional[dict]):
+    """Drop cached tiles of an exercise that overlap any of the given geometries"""
+    map_tile_generation[exercise_id] = map_tile_generation.get(exercise_id, 0) + 1
+    areas = [bounds for bounds in map(geometry_bounds, geometries) if bounds]
+    for key in [key for key in map_tile_cache if key[0] == exercise_id]:
+        _, z, x, y = key
+        tile = tile_bounds(z, x, y, TILE_BUFFER)
+        if any(bounds_intersect(tile, area) for area in areas):
+            del map_tile_cache[key]
+
+async def write_map_object(operation, *args):
+    """Run a map_objects write, turning geometries 2dsphere cannot index into a 422"""
+    try:
+        return await operation(*args)
+    except WriteError as e:
+        if e.code == 16755:
+            raise HTTPException(status_code=422, detail=f"Invalid geometry: {e.details.get('errmsg', e)}")
+        raise
 
 # Mapping Models
 class MapObject(BaseModel):
@@ -1771,7 +4687,7 @@ class MapObject(BaseModel):
     name: str
     description: str = ""
     color: str = "#3388ff"
-    geometry: dict  # GeoJSON geometry
+    geometry: dict  # GeoJSON geometry, [longitude, latitude]
     image: Optional[str] = None
     created_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1792,26 +4708,116 @@ class MapObjectUpdate(BaseModel):
     geometry: Optional[dict] = None
     image: Optional[str] = None
 
+class MapObjectBatchAction(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class MapObjectBatchOperation(BaseModel):
+    op: MapObjectBatchAction
+    id: Optional[str] = None  # update and delete
+    object: Optional[MapObjectCreate] = None  # create
+    changes: Optional[MapObjectUpdate] = None  # update
+
+class MapObjectBatch(BaseModel):
+    operations: List[MapObjectBatchOperation]
+
+class MapObjectBatchResult(BaseModel):
+    index: int
+    op: MapObjectBatchAction
+    id: Optional[str] = None
+    status: str  # "created", "updated", "deleted", "not_found" or "error"
+    error: Optional[str] = None
+    object: Optional[MapObject] = None
+
+class MapObjectBatchResponse(BaseModel):
+    results: List[MapObjectBatchResult]
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+MAP_OBJECT_BATCH_MAX = 1000
+
 # Mapping API Endpoints
 @app.post("/api/map-objects", response_model=MapObject)
 async def create_map_object(map_object: MapObjectCreate):
-    map_obj_dict = map_object.dict()
+    map_obj_dict = await store_embedded_images(map_object.dict())
+    map_obj_dict["geometry"] = validated_geometry(map_obj_dict["geometry"])
+    map_obj_dict["simplified_geometry"] = simplified_versions(map_obj_dict["geometry"])
     map_obj_dict["id"] = str(uuid.uuid4())
     map_obj_dict["created_at"] = datetime.now(timezone.utc)
     map_obj_dict["updated_at"] = datetime.now(timezone.utc)
     
-    await db.map_objects.insert_one(map_obj_dict)
+    await write_map_object(db.map_objects.insert_one, map_obj_dict)
+    invalidate_map_tiles(map_obj_dict["exercise_id"], map_obj_dict["geometry"])
+    exercise_events.publish_change("map_objects", "created", map_obj_dict)
     return MapObject(**map_obj_dict)
 
 @app.get("/api/map-objects", response_model=List[MapObject])
-async def get_map_objects(exercise_id: str, type: Optional[str] = None):
+async def get_map_objects(
+    exercise_id: str,
+    response: Response,
+    type: Optional[str] = None,
+    bbox: Optional[str] = Query(None, description="west,south,east,north; only features intersecting the box"),
+    near: Optional[str] = Query(None, description="lng,lat; nearest features first, not paginated"),
+    max_distance: Optional[float] = Query(None, gt=0, description="Meters from near="),
+    zoom: Optional[int] = Query(None, ge=0, le=24, description="Map zoom; lines and polygons are simplified to match"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+):
+    if bbox and near:
+        raise HTTPException(status_code=400, detail="Use either bbox or near, not both")
     query = {"exercise_id": exercise_id}
     if type:
         query["type"] = type
-    
-    map_objects = await db.map_objects.find(query).to_list(length=None)
+    if bbox:
+        geometry_filter = parse_bbox(bbox)
+        if geometry_filter:
+            query["geometry"] = geometry_filter
+    if near:
+        # $nearSphere orders by distance, which keyset pagination cannot follow
+        query["geometry"] = parse_near(near, max_distance)
+        map_objects = await db.map_objects.find(query, zoom_projection(zoom)).to_list(limit)
+    else:
+        map_objects = await fetch_page(db.map_objects, query, limit, after, response, zoom_projection(zoom))
+    if zoom is not None:
+        for obj in map_objects:
+            obj["geometry"] = geometry_for_zoom(obj, zoom)
     return [MapObject(**obj) for obj in map_objects]
 
+@app.get("/api/map-objects/tiles/{exercise_id}/{z}/{x}/{y}")
+async def get_map_tile(exercise_id: str, z: int, x: int, y: int, request: Request):
+    """GeoJSON tile of an exercise's map objects, clipped and quantized to the tile"""
+    if not 0 <= z <= TILE_MAX_ZOOM or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    key = (exercise_id, z, x, y)
+    cached = map_tile_cache.get(key)
+    if cached and (datetime.now(timezone.utc) - cached[0]).total_seconds() >= TILE_CACHE_TTL_SECONDS:
+        cached = None
+    cache_status = "HIT"
+    if cached is None:
+        cache_status = "MISS"
+        generation = map_tile_generation.get(exercise_id, 0)
+        query = {"exercise_id": exercise_id}
+        geometry_filter = bbox_filter(*tile_bounds(z, x, y, TILE_BUFFER))
+        if geometry_filter:
+            query["geometry"] = geometry_filter
+        documents = await db.map_objects.find(query, zoom_projection(z)).to_list(length=None)
+        body = await asyncio.to_thread(render_map_tile, documents, z, x, y)
+        cached = (datetime.now(timezone.utc), f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        if generation == map_tile_generation.get(exercise_id, 0):
+            map_tile_cache[key] = cached
+            while len(map_tile_cache) > TILE_CACHE_MAX_TILES:
+                map_tile_cache.popitem(last=False)
+    else:
+        map_tile_cache.move_to_end(key)
+    _, etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Cache": cache_status}
+    if etag in {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=TILE_MEDIA_TYPE, headers=headers)
+
 @app.get("/api/map-objects/{object_id}", response_model=MapObject)
 async def get_map_object(object_id: str):
     map_object = await db.map_objects.find_one({"id": object_id})
@@ -1822,28 +4828,301 @@ async def get_map_object(object_id: str):
 @app.put("/api/map-objects/{object_id}", response_model=MapObject)
 async def update_map_object(object_id: str, map_object: MapObjectUpdate):
     update_dict = {k: v for k, v in map_object.dict().items() if v is not None}
+    update_dict = await store_embedded_images(update_dict)
+    if "geometry" in update_dict:
+        update_dict["geometry"] = validated_geometry(update_dict["geometry"])
+        update_dict["simplified_geometry"] = simplified_versions(update_dict["geometry"])
     update_dict["updated_at"] = datetime.now(timezone.utc)
     
-    result = await db.map_objects.update_one(
+    # The previous version tells us which cached tiles the object used to cover
+    previous_object = await write_map_object(
+        db.map_objects.find_one_and_update,
         {"id": object_id}, 
         {"$set": update_dict}
     )
     
-    if result.matched_count == 0:
+    if previous_object is None:
         raise HTTPException(status_code=404, detail="Map object not found")
     
-    updated_object = await db.map_objects.find_one({"id": object_id})
+    updated_object = {**previous_object, **update_dict}
+    invalidate_map_tiles(updated_object["exercise_id"], previous_object.get("geometry"), updated_object.get("geometry"))
+    exercise_events.publish_change("map_objects", "updated", updated_object, sorted(update_dict))
     return MapObject(**updated_object)
 
 @app.delete("/api/map-objects/{object_id}")
 async def delete_map_object(object_id: str):
-    result = await db.map_objects.delete_one({"id": object_id})
-    if result.deleted_count == 0:
+    deleted_object = await db.map_objects.find_one_and_delete({"id": object_id}, {"exercise_id": 1, "geometry": 1})
+    if deleted_object is None:
         raise HTTPException(status_code=404, detail="Map object not found")
+    invalidate_map_tiles(deleted_object["exercise_id"], deleted_object.get("geometry"))
+    exercise_events.publish_change("map_objects", "deleted", {**deleted_object, "id": object_id})
     return {"message": "Map object deleted successfully"}
 
+@app.post("/api/map-objects/batch", response_model=MapObjectBatchResponse)
+async def batch_map_objects(batch: MapObjectBatch):
+    """Apply a leaflet-draw edit session's creates, updates and deletes in one unordered bulk_write"""
+    if len(batch.operations) > MAP_OBJECT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {MAP_OBJECT_BATCH_MAX} operations per batch")
+    referenced_ids = [operation.id for operation in batch.operations if operation.id]
+    previous_objects = {
+        document["id"]: document
+        async for document in db.map_objects.find(
+            {"id": {"$in": referenced_ids}}, {"_id": 0, "simplified_geometry": 0}
+        )
+    } if referenced_ids else {}
+
+    results = []
+    accepted = []
+    now = datetime.now(timezone.utc)
+    for index, operation in enumerate(batch.operations):
+        result = MapObjectBatchResult(index=index, op=operation.op, id=operation.id, status="error")
+        results.append(result)
+        try:
+            if operation.op == MapObjectBatchAction.CREATE:
+                if operation.object is None:
+                    raise ValueError("create needs an object")
+                document = operation.object.dict()
+                document["geometry"] = normalize_geometry(document["geometry"])
+                document["simplified_geometry"] = simplified_versions(document["geometry"])
+                document.update(id=str(uuid.uuid4()), created_at=now, updated_at=now)
+                MapObject(**document)
+                result.id = document["id"]
+                accepted.append((result, "created", None, document))
+                continue
+            if not operation.id:
+                raise ValueError(f"{operation.op.value} needs an id")
+            previous = previous_objects.get(operation.id)
+            if previous is None:
+                result.status = "not_found"
+                continue
+            if operation.op == MapObjectBatchAction.DELETE:
+                accepted.append((result, "deleted", previous, None))
+                continue
+            if operation.changes is None:
+                raise ValueError("update needs changes")
+            update_dict = {k: v for k, v in operation.changes.dict().items() if v is not None}
+            if "geometry" in update_dict:
+                update_dict["geometry"] = normalize_geometry(update_dict["geometry"])
+                update_dict["simplified_geometry"] = simplified_versions(update_dict["geometry"])
+            update_dict["updated_at"] = now
+            MapObject(**{**previous, **update_dict})
+            accepted.append((result, "updated", previous, update_dict))
+        except ValueError as e:
+            result.error = str(e)
+
+    # Images are stored only once every operation has been validated, so a rejected
+    # operation leaves no blobs behind
+    writes = []
+    write_results = []
+    for result, status, previous, changes in accepted:
+        if status == "deleted":
+            writes.append(DeleteOne({"id": previous["id"]}))
+            write_results.append((result, status, previous, None))
+            continue
+        changes = await store_embedded_images(changes)
+        if status == "created":
+            writes.append(InsertOne(changes))
+            current = changes
+        else:
+            writes.append(UpdateOne({"id": previous["id"]}, {"$set": changes}))
+            current = {**previous, **changes}
+        result.object = MapObject(**current)
+        write_results.append((result, status, previous, current))
+
+    failed_writes = {}
+    if writes:
+        try:
+            await db.map_objects.bulk_write(writes, ordered=False)
+        except BulkWriteError as e:
+            failed_writes = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+
+    for write_index, (result, status, previous, current) in enumerate(write_results):
+        if write_index in failed_writes:
+            result.error = failed_writes[write_index]
+            result.object = None
+            continue
+        result.status = status
+        exercise_id = (current or previous)["exercise_id"]
+        invalidate_map_tiles(
+            exercise_id,
+            previous.get("geometry") if previous else None,
+            current.get("geometry") if current else None
+        )
+        exercise_events.publish_change("map_objects", status, current or previous)
+
+    response = MapObjectBatchResponse(results=results)
+    for result in results:
+        if result.status in ("created", "updated", "deleted"):
+            setattr(response, result.status, getattr(response, result.status) + 1)
+        else:
+            response.failed += 1
+    return response
+
+@app.post("/api/admin/normalize-map-geometry")
+async def normalize_map_geometry():
+    """One-off migration rewriting stored map geometries as 2dsphere-indexable GeoJSON with simplifications"""
+    operations = []
+    operation_ids = []
+    normalized = 0
+    invalid = []
+
+    async def flush():
+        try:
+            return (await db.map_objects.bulk_write(operations, ordered=False)).modified_count
+        except BulkWriteError as e:
+            # Well-formed but self-intersecting shapes are still rejected by the 2dsphere index
+            invalid.extend(
+                {"id": operation_ids[error["index"]], "error": error["errmsg"]}
+                for error in e.details["writeErrors"]
+            )
+            return e.details["nModified"]
+
+    projection = {"_id": 0, "id": 1, "geometry": 1, "simplified_geometry": 1}
+    async for document in db.map_objects.find({}, projection):
+        try:
+            geometry = normalize_geometry(document.get("geometry"))
+        except ValueError as e:
+            invalid.append({"id": document.get("id"), "error": str(e)})
+            continue
+        if geometry != document.get("geometry") or "simplified_geometry" not in document:
+            operations.append(UpdateOne(
+                {"id": document["id"]},
+                {"$set": {"geometry": geometry, "simplified_geometry": simplified_versions(geometry)}}
+            ))
+            operation_ids.append(document["id"])
+        if len(operations) >= 500:
+            normalized += await flush()
+            operations, operation_ids = [], []
+    if operations:
+        normalized += await flush()
+    map_tile_cache.clear()
+    await ensure_indexes()
+    return {"message": "Map geometries normalized", "normalized": normalized, "invalid": invalid}
+
+# Exercise Bundle Model
+class ExerciseBundle(BaseModel):
+    """Composite exercise document; sections left out of include= are null"""
+    exercise: Optional[ExerciseBuilder] = None
+    objectives: Optional[List[ExerciseObjective]] = None
+    scenarios: Optional[List[Scenario]] = None
+    map_objects: Optional[List[MapObject]] = None
+    scribe_templates: Optional[List[ScribeTemplate]] = None
+    evaluation_reports: Optional[List[EvaluationReport]] = None
+    lessons_learned: Optional[List[LessonsLearned]] = None
+    msel: Optional[List[MSELEvent]] = None
+
+# Child collections that make up an exercise bundle, with their sort order
+BUNDLE_SECTIONS = {
+    "objectives": ("exercise_objectives", ExerciseObjective, [("created_at", 1)]),
+    "scenarios": ("scenarios", Scenario, [("created_at", 1)]),
+    "map_objects": ("map_objects", MapObject, [("created_at", 1), ("id", 1)]),
+    "scribe_templates": ("scribe_templates", ScribeTemplate, [("created_at", 1)]),
+    "evaluation_reports": ("evaluation_reports", EvaluationReport, [("created_at", 1)]),
+    "lessons_learned": ("lessons_learned", LessonsLearned, [("serial_number", 1)]),
+    "msel": ("msel_events", MSELEvent, MSEL_ORDER),
+}
+
+async def load_bundle_section(section: str, exercise_id: str) -> list:
+    collection_name, model, sort = BUNDLE_SECTIONS[section]
+    documents = await db[collection_name].find({"exercise_id": exercise_id}).sort(sort).to_list(length=None)
+    return [model(**parse_from_mongo(document, model)) for document in documents]
+
+# Exercise Bundle API Endpoint
+@app.get("/api/exercises/{exercise_id}/bundle", response_model=ExerciseBundle)
+async def get_exercise_bundle(exercise_id: str, include: Optional[str] = None):
+    """Load an exercise and its child collections concurrently in one request"""
+    sections = [name.strip() for name in include.split(",") if name.strip()] if include else \
+        ["exercise", *BUNDLE_SECTIONS]
+    unknown = [name for name in sections if name != "exercise" and name not in BUNDLE_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown bundle sections: {', '.join(unknown)}")
+
+    children = [name for name in sections if name in BUNDLE_SECTIONS]
+    exercise, *results = await asyncio.gather(
+        db.exercise_builder.find_one(
+            {"id": exercise_id}, None if "exercise" in sections else {"_id": 0, "id": 1}
+        ),
+        *(load_bundle_section(name, exercise_id) for name in children)
+    )
+    if not exercise:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+
+    bundle = ExerciseBundle(**dict(zip(children, results)))
+    if "exercise" in sections:
+        bundle.exercise = ExerciseBuilder(**parse_from_mongo(exercise, ExerciseBuilder))
+    return bundle
+
+# Live exercise channel endpoints
+LIVE_MODELS = {
+    "msel_events": MSELEvent,
+    "map_objects": MapObject,
+    "scribe_templates": ScribeTemplate,
+}
+
+@app.get("/api/exercises/{exercise_id}/events")
+async def stream_exercise_events(exercise_id: str):
+    """Server-sent events for MSEL, map object and scribe changes in one exercise"""
+    async def events():
+        queue = exercise_events.subscribe(exercise_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            exercise_events.unsubscribe(exercise_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/api/exercises/{exercise_id}/live")
+async def exercise_live_socket(websocket: WebSocket, exercise_id: str):
+    """WebSocket carrying the same events as the SSE stream"""
+    await websocket.accept()
+    queue = exercise_events.subscribe(exercise_id)
+
+    async def forward():
+        while True:
+            await websocket.send_json(await queue.get())
+
+    sender = asyncio.create_task(forward())
+    try:
+        while True:
+            # Clients only send keepalives; this raises once they disconnect
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        exercise_events.unsubscribe(exercise_id, queue)
+
 # Weather endpoints moved to before router inclusion
 
+@app.on_event("startup")
+async def startup_ensure_indexes():
+    await ensure_indexes()
+    await backfill_counters()
+    await ensure_sort_keys()
+    await weather_index.rebuild()
+    exercise_events.start()
+    global timeline_sync_task
+    timeline_sync_task = asyncio.create_task(follow_timelines())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await exercise_events.stop()
+    if timeline_sync_task is not None:
+        timeline_sync_task.cancel()
+    for exercise_id in list(active_timelines):
+        halt_timeline(exercise_id)
+    client.close()
+    await weather_proxy.close()
+    if derivative_executor is not None:
+        derivative_executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
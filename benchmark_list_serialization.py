@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the fast list serialization path in backend/server.py
+Compares the previous per-row model construction + FastAPI response_model
+re-validation + stdlib json encoding against fast_list_response on 10k-row
+MSEL and participant lists. Run from the backend container (needs MONGO_URL/DB_NAME
+only to import the module; no database connection is made).
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "exrsim_benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from pydantic import TypeAdapter  # noqa: E402
+from server import MSELEvent, Participant, fast_list_response, parse_from_mongo  # noqa: E402
+
+ROWS = 10000
+REPEATS = 5
+
+def make_msel_rows():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [{
+        "id": str(uuid.uuid4()),
+        "exercise_id": "benchmark-exercise",
+        "event_number": i + 1,
+        "scenario_time": f"T+{i} minutes",
+        "event_type": "Inject",
+        "inject_mode": "Phone",
+        "from_entity": "SimCell",
+        "to_entity": "EOC Director",
+        "message": f"Situation update {i}: Water levels rising at the north bridge",
+        "expected_response": "Activate flood response plan",
+        "objective_capability_task": "Operational Coordination",
+        "notes": "",
+        "completed": i % 3 == 0,
+        "actual_time": None,
+        "created_at": now,
+        "updated_at": now,
+    } for i in range(ROWS)]
+
+def make_participant_rows():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [{
+        "id": str(uuid.uuid4()),
+        "name": f"Participant {i}",
+        "email": f"participant{i}@example.org",
+        "phone": "555-0100",
+        "organization": "Regional EMO",
+        "role": "observer",
+        "certifications": ["ICS-100", "ICS-200"],
+        "firstName": "Participant",
+        "lastName": str(i),
+        "position": "Planning Section",
+        "city": "Winnipeg",
+        "provinceState": "Manitoba",
+        "involvedInExercise": True,
+        "profileImage": "/api/blobs/" + "0" * 64,
+        "created_at": now,
+    } for i in range(ROWS)]
+
+def previous_path(model, rows):
+    """Per-row models, response_model re-validation, then stdlib json encoding"""
+    models = [model(**parse_from_mongo(row, model)) for row in rows]
+    adapter = TypeAdapter(List[model])
+    validated = adapter.validate_python([item.model_dump() for item in models])
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+def fast_path(model, rows):
+    return fast_list_response(model, rows).body
+
+def best_of(func, model, make_rows):
+    timings = []
+    for _ in range(REPEATS):
+        rows = make_rows()
+        start = time.perf_counter()
+        func(model, rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    print("=" * 60)
+    print(f"LIST SERIALIZATION BENCHMARK ({ROWS} rows, best of {REPEATS})")
+    print("=" * 60)
+    for label, model, make_rows in [
+        ("MSEL events", MSELEvent, make_msel_rows),
+        ("Participants", Participant, make_participant_rows),
+    ]:
+        previous = best_of(previous_path, model, make_rows)
+        fast = best_of(fast_path, model, make_rows)
+        print(f"{label:<14} previous: {previous * 1000:8.1f} ms   fast: {fast * 1000:8.1f} ms   "
+              f"speedup: {previous / fast:5.1f}x")
+
+if __name__ == "__main__":
+    main()
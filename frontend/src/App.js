@@ -85,6 +85,25 @@ import {
 
 const API = process.env.REACT_APP_BACKEND_URL + '/api';
 
+// Saved images are blob store paths on the backend (/api/blobs/<sha256>); data
+// URIs from unsaved forms and absolute URLs are used as they are
+const assetUrl = (src) => (
+  typeof src === 'string' && src.startsWith('/api/') ? `${process.env.REACT_APP_BACKEND_URL}${src}` : src
+);
+
+// List endpoints return one page at a time with the cursor for the next page in
+// the X-Next-Cursor header; follow it until the last page
+const fetchAllPages = async (url, params = {}) => {
+  const items = [];
+  let after = null;
+  do {
+    const response = await axios.get(url, { params: after ? { ...params, after } : params });
+    items.push(...response.data);
+    after = response.headers['x-next-cursor'];
+  } while (after);
+  return items;
+};
+
 // Theme Context
 const ThemeContext = createContext();
 
@@ -766,11 +785,8 @@ const WeatherModule = ({ theme }) => {
 
   const fetchAllLocations = async () => {
     try {
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/weather-locations`);
-      if (response.ok) {
-        const data = await response.json();
-        setWeatherLocations(data);
-      }
+      const data = await fetchAllPages(`${API}/weather-locations`);
+      setWeatherLocations(data);
     } catch (error) {
       console.error('Error fetching all locations:', error);
     }
@@ -1039,7 +1055,7 @@ const WeatherModule = ({ theme }) => {
               </label>
               <div className="border border-gray-300 rounded-lg p-4 bg-gray-50">
                 <img
-                  src={rssData.rss_feed}
+                  src={`${process.env.REACT_APP_BACKEND_URL}${rssData.proxy_url}`}
                   alt={`Weather satellite image for ${rssData.city}, ${rssData.province}`}
                   className="max-w-full h-auto mx-auto"
                   onError={(e) => {
@@ -1782,14 +1798,9 @@ const LeafletMapping = ({ exerciseId }) => {
 
   const fetchMapObjects = async () => {
     try {
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/map-objects?exercise_id=${exerciseId}`);
-      if (response.ok) {
-        const data = await response.json();
-        console.log(`📊 Fetched ${data.length} map objects from backend`);
-        setMapObjects(data);
-      } else {
-        console.error('Failed to fetch map objects. Status:', response.status);
-      }
+      const data = await fetchAllPages(`${API}/map-objects`, { exercise_id: exerciseId });
+      console.log(`📊 Fetched ${data.length} map objects from backend`);
+      setMapObjects(data);
     } catch (error) {
       console.error('Error fetching map objects:', error);
     }
@@ -1922,11 +1933,43 @@ const LeafletMapping = ({ exerciseId }) => {
     handleObjectCreate(geoJson, layerType === 'polyline' ? 'line' : layerType);
   };
 
+  // Send every change from one leaflet-draw session in a single batch request
+  const saveMapObjectBatch = async (operations) => {
+    if (operations.length === 0) return;
+    try {
+      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/map-objects/batch`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ operations }),
+      });
+
+      if (response.ok) {
+        const { results, failed } = await response.json();
+        const updated = new Map(results.filter(r => r.status === 'updated').map(r => [r.id, r.object]));
+        const deleted = new Set(results.filter(r => r.status === 'deleted').map(r => r.id));
+        setMapObjects(prev => prev
+          .filter(obj => !deleted.has(obj.id))
+          .map(obj => updated.get(obj.id) || obj));
+        if (failed > 0) {
+          console.error('Some map object changes were not saved:', results.filter(r => r.error || r.status === 'not_found'));
+        }
+        console.log(`✅ Saved ${operations.length - failed} of ${operations.length} map object changes`);
+      } else {
+        console.error('Failed to save map object changes. Status:', response.status);
+      }
+    } catch (error) {
+      console.error('Error saving map object changes:', error);
+    }
+  };
+
   const handleDrawEdited = async (e) => {
     const { layers } = e;
     console.log('✏️ Draw edited:', layers.getLayers().length, 'layers');
     
-    layers.eachLayer(async (layer) => {
+    const operations = [];
+    layers.eachLayer((layer) => {
       const geoJson = layer.toGeoJSON();
       console.log('🔄 Edited layer:', geoJson);
       
@@ -1945,18 +1988,18 @@ const LeafletMapping = ({ exerciseId }) => {
       });
       
       if (matchingObject) {
-        await handleObjectUpdate(matchingObject.id, {
-          geometry: geoJson.geometry
-        });
+        operations.push({ op: 'update', id: matchingObject.id, changes: { geometry: geoJson.geometry } });
       }
     });
+    await saveMapObjectBatch(operations);
   };
 
   const handleDrawDeleted = async (e) => {
     const { layers } = e;
     console.log('🗑️ Draw deleted:', layers.getLayers().length, 'layers');
     
-    layers.eachLayer(async (layer) => {
+    const operations = [];
+    layers.eachLayer((layer) => {
       const geoJson = layer.toGeoJSON();
       console.log('❌ Deleted layer:', geoJson);
       
@@ -1967,9 +2010,12 @@ const LeafletMapping = ({ exerciseId }) => {
       });
       
       if (matchingObject) {
-        await handleObjectDelete(matchingObject.id);
+        operations.push({ op: 'delete', id: matchingObject.id });
       }
     });
+    if (operations.length > 0 && window.confirm(`Are you sure you want to delete ${operations.length} map object(s)?`)) {
+      await saveMapObjectBatch(operations);
+    }
   };
 
   const getDefaultColorForType = (type) => {
@@ -2796,7 +2842,7 @@ const LeafletMapping = ({ exerciseId }) => {
                       {modalFormData.image && (
                         <div className="relative">
                           <img 
-                            src={modalFormData.image} 
+                            src={assetUrl(modalFormData.image)} 
                             alt="Object" 
                             className="w-full h-32 object-cover rounded border"
                           />
@@ -2814,7 +2860,7 @@ const LeafletMapping = ({ exerciseId }) => {
                     <div className="bg-gray-50 p-2 rounded">
                       {hoveredObject.image ? (
                         <img 
-                          src={hoveredObject.image} 
+                          src={assetUrl(hoveredObject.image)} 
                           alt="Object" 
                           className="w-full h-32 object-cover rounded"
                         />
@@ -3552,7 +3598,7 @@ const ScenarioManagement = ({ exerciseId }) => {
           </div>
           ${scenario.scenario_image ? `<div class="section">
             <div class="label">Scenario Image:</div>
-            <img class="image" src="${scenario.scenario_image}" alt="Scenario Image" />
+            <img class="image" src="${assetUrl(scenario.scenario_image)}" alt="Scenario Image" />
           </div>` : ''}
           <div class="section">
             <div class="label">Status:</div>
@@ -3695,7 +3741,7 @@ const ScenarioManagement = ({ exerciseId }) => {
                     {scenario.scenario_image ? (
                       <div className="w-32 h-32 rounded-lg overflow-hidden border border-gray-600 shadow-lg">
                         <img 
-                          src={scenario.scenario_image} 
+                          src={assetUrl(scenario.scenario_image)} 
                           alt={`Scenario: ${scenario.scenario_name}`} 
                           className="w-full h-full object-cover hover:scale-105 transition-transform duration-200"
                         />
@@ -4107,7 +4153,7 @@ const ScenarioForm = ({ exerciseId, editingScenario, onBack, onSave }) => {
             <div className="flex items-center space-x-6">
               <div className={`w-32 h-32 rounded-lg ${theme.colors.quaternary} border-2 border-dashed ${theme.colors.border} flex items-center justify-center overflow-hidden`}>
                 {imagePreview ? (
-                  <img src={imagePreview} alt="Scenario" className="w-full h-full object-cover rounded-lg" />
+                  <img src={assetUrl(imagePreview)} alt="Scenario" className="w-full h-full object-cover rounded-lg" />
                 ) : (
                   <div className="text-center">
                     <Camera className={`h-8 w-8 ${theme.colors.textMuted} mx-auto mb-2`} />
@@ -5165,7 +5211,7 @@ const Dashboard = () => {
                   </div>
                   {exercise.exercise_image && (
                     <div className={`w-12 h-12 rounded ${theme.colors.quaternary} overflow-hidden ml-3`}>
-                      <img src={exercise.exercise_image} alt={exercise.exercise_name} className="w-full h-full object-cover" />
+                      <img src={assetUrl(exercise.exercise_image)} alt={exercise.exercise_name} className="w-full h-full object-cover" />
                     </div>
                   )}
                 </div>
@@ -5581,7 +5627,7 @@ const ParticipantForm = ({ onBack, onSave, editingParticipant = null }) => {
             <div className="flex items-center space-x-6">
               <div className="w-32 h-32 rounded-lg bg-gray-700 border-2 border-dashed border-gray-600 flex items-center justify-center overflow-hidden">
                 {imagePreview ? (
-                  <img src={imagePreview} alt="Profile" className="w-full h-full object-cover rounded-lg" />
+                  <img src={assetUrl(imagePreview)} alt="Profile" className="w-full h-full object-cover rounded-lg" />
                 ) : (
                   <div className="text-center">
                     <Camera className="h-8 w-8 text-gray-400 mx-auto mb-2" />
@@ -6149,7 +6195,7 @@ const ParticipantsList = ({ onAddNew, onEdit }) => {
               <CardContent className="p-4">
                 <div className="flex items-center space-x-4">
                   <Avatar className="w-16 h-16">
-                    <AvatarImage src={participant.profileImage} alt={participant.name} />
+                    <AvatarImage src={assetUrl(participant.profileImage)} alt={participant.name} />
                     <AvatarFallback className="bg-orange-500 text-black text-lg font-semibold">
                       {getInitials(participant.name)}
                     </AvatarFallback>
@@ -6583,7 +6629,7 @@ const ResourceForm = ({ onBack, onSave, editingResource }) => {
                 <div className="flex items-center space-x-6">
                   <div className="w-32 h-32 rounded-lg bg-gray-700 border-2 border-dashed border-gray-600 flex items-center justify-center overflow-hidden">
                     {imagePreview ? (
-                      <img src={imagePreview} alt="Resource" className="w-full h-full object-cover rounded-lg" />
+                      <img src={assetUrl(imagePreview)} alt="Resource" className="w-full h-full object-cover rounded-lg" />
                     ) : (
                       <div className="text-center">
                         <Camera className="h-8 w-8 text-gray-400 mx-auto mb-2" />
@@ -6839,8 +6885,7 @@ const ResourcesList = ({ onAddNew, onEdit }) => {
 
   const fetchResources = async () => {
     try {
-      const response = await axios.get(`${API}/resources`);
-      setResources(response.data);
+      setResources(await fetchAllPages(`${API}/resources`));
     } catch (error) {
       console.error('Error fetching resources:', error);
     } finally {
@@ -7147,7 +7192,7 @@ const ResourcesList = ({ onAddNew, onEdit }) => {
                       <div className="mb-4">
                         <div className="w-full h-32 rounded-lg overflow-hidden bg-gray-800">
                           <img 
-                            src={resource.resource_image} 
+                            src={assetUrl(resource.resource_image)} 
                             alt={resource.identification}
                             className="w-full h-full object-cover"
                           />
@@ -7369,7 +7414,7 @@ const ExerciseListView = () => {
                     <div className="w-16 h-16 rounded-lg bg-gray-600 overflow-hidden flex items-center justify-center">
                       {exercise.exercise_image ? (
                         <img 
-                          src={exercise.exercise_image} 
+                          src={assetUrl(exercise.exercise_image)} 
                           alt={exercise.exercise_name} 
                           className="w-full h-full object-cover"
                         />
@@ -7467,7 +7512,7 @@ const ExerciseDetailView = ({ exercise, onBack }) => {
           {exercise.exercise_image && (
             <div className="w-32 h-32 rounded-lg bg-gray-700 overflow-hidden flex-shrink-0">
               <img 
-                src={exercise.exercise_image} 
+                src={assetUrl(exercise.exercise_image)} 
                 alt={exercise.exercise_name} 
                 className="w-full h-full object-cover"
               />
@@ -7556,7 +7601,7 @@ const ExerciseDetailView = ({ exercise, onBack }) => {
                 {exercise.scenario_image && (
                   <div className="w-24 h-24 rounded bg-gray-700 overflow-hidden flex-shrink-0">
                     <img 
-                      src={exercise.scenario_image} 
+                      src={assetUrl(exercise.scenario_image)} 
                       alt={exercise.scenario_name} 
                       className="w-full h-full object-cover"
                     />
@@ -7956,8 +8001,7 @@ const MSELList = ({ onAddNew, onEdit }) => {
 
   const fetchEvents = async () => {
     try {
-      const response = await axios.get(`${API}/msel`);
-      setEvents(response.data);
+      setEvents(await fetchAllPages(`${API}/msel`));
     } catch (error) {
       console.error('Error fetching MSEL events:', error);
     } finally {
@@ -8002,8 +8046,8 @@ const MSELList = ({ onAddNew, onEdit }) => {
     return colors[eventType] || 'bg-gray-500/20 text-gray-300 border-gray-500/30';
   };
 
-  // Sort events by event number
-  const sortedEvents = [...events].sort((a, b) => a.event_number - b.event_number);
+  // Sort events in MSEL order (sort_key), which moves and inserts update
+  const sortedEvents = [...events].sort((a, b) => (a.sort_key ?? 0) - (b.sort_key ?? 0) || a.event_number - b.event_number);
 
   return (
     <div className="p-6">
@@ -8521,7 +8565,7 @@ const HIRAForm = ({ onBack, onSave, editingEntry = null }) => {
             <div className="flex items-center space-x-6">
               <div className="w-32 h-32 rounded-lg bg-gray-700 border-2 border-dashed border-gray-600 flex items-center justify-center overflow-hidden">
                 {imagePreview ? (
-                  <img src={imagePreview} alt="Hazard" className="w-full h-full object-cover rounded-lg" />
+                  <img src={assetUrl(imagePreview)} alt="Hazard" className="w-full h-full object-cover rounded-lg" />
                 ) : (
                   <div className="text-center">
                     <AlertTriangle className="h-8 w-8 text-gray-400 mx-auto mb-2" />
@@ -8917,7 +8961,7 @@ const HIRAList = ({ onAddNew, onEdit }) => {
                     {/* Hazard Image */}
                     <div className="flex-shrink-0">
                       <Avatar className="w-16 h-16">
-                        <AvatarImage src={entry.hazard_image} alt={entry.name} />
+                        <AvatarImage src={assetUrl(entry.hazard_image)} alt={entry.name} />
                         <AvatarFallback className="bg-gray-600 text-orange-500 text-lg font-semibold">
                           <AlertTriangle className="h-8 w-8" />
                         </AvatarFallback>
@@ -9780,7 +9824,7 @@ const ExerciseBuilderWizard = ({ onBack, editingExercise = null }) => {
     <div className="flex items-center space-x-6">
       <div className="w-32 h-32 rounded-lg bg-gray-700 border-2 border-dashed border-gray-600 flex items-center justify-center overflow-hidden">
         {imagePreview[imageType] ? (
-          <img src={imagePreview[imageType]} alt={title} className="w-full h-full object-cover rounded-lg" />
+          <img src={assetUrl(imagePreview[imageType])} alt={title} className="w-full h-full object-cover rounded-lg" />
         ) : (
           <div className="text-center">
             <Camera className="h-8 w-8 text-gray-400 mx-auto mb-2" />
@@ -12400,7 +12444,7 @@ const ExerciseManagementDashboard = ({
             </div>
             {exercise.exercise_image && (
               <div className={`w-20 h-20 rounded-lg ${theme.colors.quaternary} overflow-hidden`}>
-                <img src={exercise.exercise_image} alt={exercise.exercise_name} className="w-full h-full object-cover" />
+                <img src={assetUrl(exercise.exercise_image)} alt={exercise.exercise_name} className="w-full h-full object-cover" />
               </div>
             )}
           </div>
@@ -13962,7 +14006,7 @@ const ExerciseManagementDashboard = ({
               ${allImages.length > 0 ? `
                 <div class="header-images">
                   <h3>Supporting Images:</h3>
-                  ${allImages.slice(0, 6).map(image => `<img src="${image}" alt="Evaluation Image" />`).join('')}
+                  ${allImages.slice(0, 6).map(image => `<img src="${assetUrl(image)}" alt="Evaluation Image" />`).join('')}
                 </div>
               ` : ''}
             </div>
@@ -14614,7 +14658,7 @@ const EvaluationReportForm = ({ exerciseId, editingReport, onBack, onSave }) =>
                   {imagePreview.map((image, index) => (
                     <div key={index} className="relative">
                       <img 
-                        src={image} 
+                        src={assetUrl(image)} 
                         alt={`Evaluation ${index + 1}`}
                         className="w-full h-32 object-cover rounded-lg border border-gray-600"
                       />
@@ -15235,7 +15279,7 @@ const LessonsLearnedForm = ({ exerciseId, editingLesson, onBack, onSave, dotmplf
                   {formData.lesson_images.map((image, index) => (
                     <div key={index} className="relative">
                       <img
-                        src={image}
+                        src={assetUrl(image)}
                         alt={`Lesson ${index + 1}`}
                         className="w-full h-24 object-cover rounded border border-gray-700 aspect-square"
                         style={{ aspectRatio: '1/1' }}
@@ -15617,7 +15661,7 @@ const LessonsLearnedForm = ({ exerciseId, editingLesson, onBack, onSave, dotmplf
               ${allImages.length > 0 ? `
                 <div class="header-images">
                   <h3>Supporting Images:</h3>
-                  ${allImages.slice(0, 6).map(image => `<img src="${image}" alt="Lesson Image" />`).join('')}
+                  ${allImages.slice(0, 6).map(image => `<img src="${assetUrl(image)}" alt="Lesson Image" />`).join('')}
                 </div>
               ` : ''}
             </div>
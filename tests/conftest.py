@@ -0,0 +1,7 @@
+import os
+import sys
+
+# server reads these at import time; the unit tests never connect to Mongo
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "exrsim_test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,36 @@
+import base64
+
+import pytest
+
+from server import decode_raw_base64_image, embedded_image
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+RAW_PNG = base64.b64encode(PNG).decode()
+
+
+def test_raw_base64_image_is_sniffed_from_its_bytes():
+    assert decode_raw_base64_image(RAW_PNG) == (PNG, "image/png")
+
+
+def test_raw_base64_image_may_be_wrapped_across_lines():
+    wrapped = "\r\n".join(RAW_PNG[i:i + 20] for i in range(0, len(RAW_PNG), 20))
+    assert decode_raw_base64_image(wrapped) == (PNG, "image/png")
+
+
+@pytest.mark.parametrize("value", [
+    "Checkpoint 4 at the north gate",
+    "iVBORw0KGgo not base64",
+    base64.b64encode(b"%PDF-1.7 not an image").decode(),
+    base64.b64encode(b"plain text that happens to be base64").decode(),
+])
+def test_other_strings_are_not_raw_base64_images(value):
+    assert decode_raw_base64_image(value) is None
+
+
+def test_embedded_image_accepts_data_uris_and_raw_base64():
+    assert embedded_image(f"data:image/png;base64,{RAW_PNG}") == (PNG, "image/png")
+    assert embedded_image(RAW_PNG) == (PNG, "image/png")
+    assert embedded_image("/api/blobs/abc") is None
+    assert embedded_image(None) is None
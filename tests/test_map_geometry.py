@@ -0,0 +1,110 @@
+import math
+
+from server import (TILE_BUFFER, bbox_filter, clip_geometry, clip_line, clip_polygon, clip_ring, clip_segment,
+                    douglas_peucker, tile_bounds)
+
+BOX = (0.0, 0.0, 10.0, 10.0)
+
+
+def great_circle_latitude(start, end, longitude):
+    """Latitude of the great circle through start and end at the given longitude"""
+    (lng1, lat1), (lng2, lat2) = start, end
+    lng1, lat1, lng2, lat2, lng = map(math.radians, (lng1, lat1, lng2, lat2, longitude))
+    tan_lat = (math.tan(lat1) * math.sin(lng2 - lng) + math.tan(lat2) * math.sin(lng - lng1)) / math.sin(lng2 - lng1)
+    return math.degrees(math.atan(tan_lat))
+
+
+def edge_latitude(ring, longitude, southern):
+    """Latitude of the ring's southern or northern edge at a longitude, following geodesic edges"""
+    latitudes = []
+    for start, end in zip(ring, ring[1:]):
+        west, east = sorted((start[0], end[0]))
+        if start[0] != end[0] and west <= longitude <= east:
+            latitudes.append(great_circle_latitude(start, end, longitude))
+    return min(latitudes) if southern else max(latitudes)
+
+
+def test_bbox_filter_keeps_point_inside_southern_edge_of_low_zoom_tile():
+    west, south, east, north = tile_bounds(4, 8, 4, TILE_BUFFER)
+    ring = bbox_filter(west, south, east, north)["$geoIntersects"]["$geometry"]["coordinates"][0]
+    point = ((west + east) / 2, south + 0.01)
+    assert edge_latitude(ring, point[0], southern=True) < point[1]
+
+
+def test_bbox_filter_keeps_point_inside_northern_edge_of_low_zoom_tile():
+    west, south, east, north = tile_bounds(4, 8, 4, TILE_BUFFER)
+    ring = bbox_filter(west, south, east, north)["$geoIntersects"]["$geometry"]["coordinates"][0]
+    point = ((west + east) / 2, north - 0.01)
+    assert edge_latitude(ring, point[0], southern=False) > point[1]
+
+
+def test_bbox_filter_ring_is_closed_and_spans_the_box():
+    ring = bbox_filter(-10.0, 40.0, 10.0, 50.0)["$geoIntersects"]["$geometry"]["coordinates"][0]
+    assert ring[0] == ring[-1] == [-10.0, 40.0]
+    assert {tuple(position) for position in ring} >= {(-10.0, 40.0), (10.0, 40.0), (10.0, 50.0), (-10.0, 50.0)}
+
+
+def test_bbox_filter_skips_boxes_wider_than_a_hemisphere():
+    assert bbox_filter(-180.0, -85.0, 180.0, 85.0) is None
+
+
+def test_douglas_peucker_drops_points_within_tolerance():
+    path = [[0, 0], [1, 0.05], [2, -0.05], [3, 0.04], [4, 0]]
+    assert douglas_peucker(path, 0.1) == [[0, 0], [4, 0]]
+
+
+def test_douglas_peucker_keeps_points_beyond_tolerance_in_order():
+    path = [[0, 0], [1, 1.52], [2, 3], [3, 1.48], [4, 0]]
+    assert douglas_peucker(path, 0.1) == [[0, 0], [2, 3], [4, 0]]
+
+
+def test_douglas_peucker_handles_short_and_closed_paths():
+    assert douglas_peucker([[0, 0], [1, 1]], 10) == [[0, 0], [1, 1]]
+    ring = [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]]
+    assert douglas_peucker(ring, 0.5) == ring
+
+
+def test_clip_segment():
+    assert clip_segment([-5, 5], [15, 5], BOX) == ([0.0, 5.0], [10.0, 5.0])
+    assert clip_segment([2, 2], [8, 8], BOX) == ([2.0, 2.0], [8.0, 8.0])
+    assert clip_segment([-5, -5], [-1, 20], BOX) is None
+    assert clip_segment([11, 0], [11, 10], BOX) is None
+
+
+def test_clip_line_splits_at_each_exit():
+    line = [[-5, 5], [5, 5], [5, 15], [8, 15], [8, 5]]
+    assert clip_line(line, BOX) == [[[0.0, 5.0], [5.0, 5.0], [5.0, 10.0]], [[8.0, 10.0], [8.0, 5.0]]]
+
+
+def test_clip_ring_cuts_to_the_box_and_stays_closed():
+    ring = [[-5, -5], [5, -5], [5, 5], [-5, 5], [-5, -5]]
+    clipped = clip_ring(ring, BOX)
+    assert clipped[0] == clipped[-1]
+    assert {tuple(point) for point in clipped} == {(0, 0), (5, 0), (5, 5), (0, 5)}
+    assert clip_ring([[20, 20], [30, 20], [30, 30], [20, 20]], BOX) == []
+
+
+def test_clip_polygon_drops_holes_outside_and_whole_polygons_outside():
+    shell = [[-5, -5], [15, -5], [15, 15], [-5, 15], [-5, -5]]
+    hole_outside = [[12, 12], [13, 12], [13, 13], [12, 12]]
+    hole_inside = [[2, 2], [3, 2], [3, 3], [2, 2]]
+    clipped = clip_polygon([shell, hole_outside, hole_inside], BOX)
+    assert len(clipped) == 2
+    assert {tuple(point) for point in clipped[0]} == {(0, 0), (10, 0), (10, 10), (0, 10)}
+    assert clipped[1] == hole_inside
+    assert clip_polygon([[[20, 20], [30, 20], [30, 30], [20, 20]]], BOX) == []
+
+
+def test_clip_geometry_by_type():
+    assert clip_geometry({"type": "Point", "coordinates": [5, 5]}, BOX) == {"type": "Point", "coordinates": [5, 5]}
+    assert clip_geometry({"type": "Point", "coordinates": [50, 5]}, BOX) is None
+    assert clip_geometry({"type": "MultiPoint", "coordinates": [[5, 5], [50, 5]]}, BOX) == {
+        "type": "MultiPoint", "coordinates": [[5, 5]]
+    }
+    line = clip_geometry({"type": "LineString", "coordinates": [[-5, 5], [5, 5], [5, 15], [8, 15], [8, 5]]}, BOX)
+    assert line["type"] == "MultiLineString" and len(line["coordinates"]) == 2
+    polygons = {"type": "MultiPolygon", "coordinates": [
+        [[[1, 1], [2, 1], [2, 2], [1, 1]]], [[[20, 20], [30, 20], [30, 30], [20, 20]]]
+    ]}
+    assert clip_geometry(polygons, BOX) == {"type": "Polygon", "coordinates": [[[1, 1], [2, 1], [2, 2], [1, 1]]]}
+    assert clip_geometry({"type": "GeometryCollection", "geometries": []}, BOX) is None
@@ -0,0 +1,41 @@
+import asyncio
+import math
+
+import pytest
+
+import server
+from server import MSEL_SORT_KEY_GAP, sort_key_between, sort_key_midpoint
+
+
+def test_sort_key_midpoint_splits_the_gap():
+    assert sort_key_midpoint(1024.0, 2048.0) == 1536.0
+
+
+def test_sort_key_midpoint_runs_out_after_repeated_inserts_at_the_same_spot():
+    lower, upper = 1024.0, 2048.0
+    inserts = 0
+    while (midpoint := sort_key_midpoint(lower, upper)) is not None:
+        upper = midpoint
+        inserts += 1
+    assert 40 < inserts < 60
+    assert math.nextafter(lower, upper) == upper
+
+
+def test_sort_key_between_rebalances_when_neighbours_are_adjacent_floats(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    monkeypatch.setattr(server, "db", mongomock_motor.AsyncMongoMockClient()["msel_order_test"])
+    crowded = math.nextafter(MSEL_SORT_KEY_GAP, math.inf)
+
+    async def scenario():
+        await server.db.msel_events.insert_many([
+            {"id": "a", "exercise_id": "x", "event_number": 1, "sort_key": MSEL_SORT_KEY_GAP},
+            {"id": "b", "exercise_id": "x", "event_number": 2, "sort_key": crowded},
+            {"id": "c", "exercise_id": "x", "event_number": 3, "sort_key": 3 * MSEL_SORT_KEY_GAP},
+        ])
+        key = await sort_key_between("x", "a", "b")
+        keys = {event["id"]: event["sort_key"] async for event in server.db.msel_events.find({}, {"_id": 0})}
+        return key, keys
+
+    key, keys = asyncio.run(scenario())
+    assert keys == {"a": MSEL_SORT_KEY_GAP, "b": 2 * MSEL_SORT_KEY_GAP, "c": 3 * MSEL_SORT_KEY_GAP}
+    assert keys["a"] < key < keys["b"]
@@ -0,0 +1,90 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from server import ExerciseTimeline, parse_scenario_time
+
+NINE_AM = 9 * 3600
+
+
+@pytest.mark.parametrize("scenario_time, expected", [
+    ("T+30 minutes", 1800),
+    ("T+1h 15m", 4500),
+    ("T+01:30", 5400),
+    ("T-15", -900),
+    ("T", 0),
+    ("14:30", 19800),
+    ("2:30 PM", 19800),
+    ("12:00 AM", 54000),
+    ("Day 2 09:00", 86400),
+])
+def test_parse_scenario_time(scenario_time, expected):
+    assert parse_scenario_time(scenario_time, NINE_AM) == expected
+
+
+def test_parse_scenario_time_rolls_clock_times_before_start_into_the_next_day():
+    assert parse_scenario_time("08:00", NINE_AM) == 23 * 3600
+
+
+def test_parse_scenario_time_without_a_start_counts_from_midnight():
+    assert parse_scenario_time("14:30", None) == 14 * 3600 + 30 * 60
+
+
+@pytest.mark.parametrize("scenario_time", [None, "", "garbage", "T+5 parsecs", "25:00", "13:00 PM", "09:60"])
+def test_parse_scenario_time_rejects_unrecognizable_times(scenario_time):
+    assert parse_scenario_time(scenario_time, NINE_AM) is None
+
+
+def test_timeline_announces_due_injects_in_offset_then_event_number_order(monkeypatch):
+    published = []
+    monkeypatch.setattr(server.exercise_events, "publish", lambda exercise_id, event: published.append(event))
+
+    async def scenario():
+        timeline = ExerciseTimeline("exercise-1", datetime.now(timezone.utc) - timedelta(seconds=59.8))
+        timeline.heap = [(30, 2, "b"), (3600, 9, "later"), (60, 4, "d"), (30, 1, "a"), (10, 5, "c")]
+        heapq.heapify(timeline.heap)
+        timeline.dirty = False
+        task = asyncio.create_task(timeline.run())
+        await asyncio.sleep(0.6)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return timeline
+
+    timeline = asyncio.run(scenario())
+    assert [event["ids"] for event in published] == [["c", "a", "b"], ["d"]]
+    assert all(event["type"] == "msel.due" for event in published)
+    assert timeline.announced == {"a": 30, "b": 30, "c": 10, "d": 60}
+    assert timeline.heap == [(3600, 9, "later")]
+
+
+def test_timeline_announces_injects_added_at_an_already_announced_offset(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    monkeypatch.setattr(server, "db", mongomock_motor.AsyncMongoMockClient()["msel_timeline_test"])
+    published = []
+    monkeypatch.setattr(server.exercise_events, "publish", lambda exercise_id, event: published.append(event))
+
+    def inject(event_id, offset):
+        return {"id": event_id, "exercise_id": "x", "event_number": 1, "completed": False,
+                "scenario_offset_seconds": offset}
+
+    async def scenario():
+        await server.db.msel_events.insert_one(inject("first", 0))
+        timeline = ExerciseTimeline("x", datetime.now(timezone.utc) - timedelta(seconds=10))
+        task = asyncio.create_task(timeline.run())
+        await asyncio.sleep(0.2)
+        await server.db.msel_events.insert_one(inject("same-offset", 0))
+        await server.db.msel_events.insert_one(inject("earlier", -60))
+        timeline.changed()
+        await asyncio.sleep(0.2)
+        timeline.changed()
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert [event["ids"] for event in published] == [["first"], ["earlier", "same-offset"]]
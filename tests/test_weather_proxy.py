@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+
+from server import WeatherFeedProxy
+
+FEED = b"<rss><channel><title>Timmins</title></channel></rss>"
+ETAG = '"v1"'
+
+
+class StandInUpstream(BaseHTTPRequestHandler):
+    """Local stand-in for the weather office: one feed with an ETag and a few redirects"""
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/feed.xml":
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.send_header("ETag", ETAG)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(FEED)))
+            self.end_headers()
+            self.wfile.write(FEED)
+        elif self.path == "/moved":
+            self.redirect("/feed.xml")
+        elif self.path == "/offsite":
+            self.redirect("http://169.254.169.254/latest/meta-data/")
+        elif self.path == "/loop":
+            self.redirect("/loop")
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def redirect(self, location):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    StandInUpstream.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInUpstream)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    return WeatherFeedProxy(tmp_path, ttl_seconds=60, max_stale_seconds=3600,
+                            max_concurrency=2, allowed_hosts=["127.0.0.1"])
+
+
+def test_miss_hit_then_stale_revalidates_with_etag(upstream, proxy):
+    url = f"{upstream}/feed.xml"
+
+    async def scenario():
+        try:
+            meta, body_path, status = await proxy.get(url)
+            assert status == "MISS"
+            assert body_path.read_bytes() == FEED
+            assert meta["etag"] == ETAG
+
+            _, _, status = await proxy.get(url)
+            assert status == "HIT"
+            assert len(StandInUpstream.requests) == 1
+
+            proxy.write_entry(url, {**meta, "fetched_at": meta["fetched_at"] - 120}, None)
+            _, body_path, status = await proxy.get(url)
+            assert status == "STALE"
+            assert body_path.read_bytes() == FEED
+            await proxy.refreshing[url]
+
+            _, body_path, status = await proxy.get(url)
+            assert status == "HIT"
+            assert body_path.read_bytes() == FEED
+        finally:
+            await proxy.close()
+
+    asyncio.run(scenario())
+    assert StandInUpstream.requests == [("/feed.xml", None), ("/feed.xml", ETAG)]
+
+
+def test_follows_redirects_within_allowed_hosts(upstream, proxy):
+    async def scenario():
+        try:
+            return await proxy.get(f"{upstream}/moved")
+        finally:
+            await proxy.close()
+
+    _, body_path, status = asyncio.run(scenario())
+    assert status == "MISS"
+    assert body_path.read_bytes() == FEED
+
+
+@pytest.mark.parametrize("path", ["/offsite", "/loop"])
+def test_rejects_redirects_off_the_allowlist_or_in_a_loop(upstream, proxy, path):
+    async def scenario():
+        try:
+            return await proxy.get(f"{upstream}{path}")
+        finally:
+            await proxy.close()
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(scenario())
+    assert raised.value.status_code == 502
+    assert all(requested in (path, "/loop") for requested, _ in StandInUpstream.requests)
+    assert len(StandInUpstream.requests) <= proxy.max_redirects + 1
+
+
+def test_refuses_hosts_off_the_allowlist(proxy):
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(proxy.get("http://169.254.169.254/latest/meta-data/"))
+    assert raised.value.status_code == 400